@@ -10,15 +10,12 @@ import sys
 import logging
 import argparse
 import signal
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 import feedparser
 
+# 需要渲染的页面使用与main.py共享的无头Chrome池，不再每次抓取都启动、关闭一个浏览器
+from browser_pool import render_page, shutdown_browser_pool
+
 # 尝试导入APScheduler，如果失败则提示用户安装
 try:
     from apscheduler.schedulers.background import BackgroundScheduler
@@ -165,6 +162,8 @@ def signal_handler(signum, frame):
     if scheduler:
         scheduler.shutdown(wait=True)
     
+    shutdown_browser_pool()
+    
     if logger:
         logger.info("程序已安全关闭")
     else:
@@ -425,28 +424,10 @@ def get_ai_news_from_source(url, source_name="机器之心"):
 def get_jiqizhixin_news(url, source_name):
     """获取机器之心新闻"""
     try:
-        print(f"[DEBUG] {source_name}: 开始使用Selenium获取新闻...")
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-        
-        print(f"[DEBUG] {source_name}: 正在初始化Chrome WebDriver...")
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        print(f"[DEBUG] {source_name}: WebDriver初始化成功，正在访问页面...")
-        driver.get(url)
-        
-        wait = WebDriverWait(driver, 10)
-        print(f"[DEBUG] {source_name}: 等待页面元素加载...")
-        wait.until(EC.presence_of_element_located((By.CLASS_NAME, "home__left-body")))
-        print(f"[DEBUG] {source_name}: 页面元素加载成功，获取页面源码...")
-        
-        page_source = driver.page_source
+        print(f"[DEBUG] {source_name}: 从浏览器池租借Chrome渲染页面...")
+        # home__left-body出现或链接数量足够即开始解析
+        page_source = render_page(url, ready_selector=(By.CLASS_NAME, "home__left-body"), logger=logger)
         print(f"[DEBUG] {source_name}: 页面源码长度: {len(page_source)} 字符")
-        driver.quit()
-        print(f"[DEBUG] {source_name}: WebDriver已关闭")
         
         soup = BeautifulSoup(page_source, "html.parser")
         articles = []
@@ -830,20 +811,7 @@ def get_techcrunch_news(url, source_name):
 def get_generic_news(url, source_name):
     """通用新闻获取方法"""
     try:
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-        
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        driver.get(url)
-        
-        wait = WebDriverWait(driver, 10)
-        
-        page_source = driver.page_source
-        driver.quit()
+        page_source = render_page(url, logger=logger)
         
         soup = BeautifulSoup(page_source, "html.parser")
         articles = []
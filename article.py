@@ -0,0 +1,59 @@
+# 文章记录
+# 抓取到的每条新闻用带__slots__的Article表示，代替原来的字典：没有每个实例的__dict__，占用内存更少；
+# 标题、链接在创建时规范化一次，发布时间保存为datetime，显示用日期和去重键也只计算一次，
+# 之后的过滤、去重、选择、摘要和发送阶段直接读取属性，不再重复做字符串处理。
+
+from date_parsing import format_date, is_date_only, parse_datetime
+from url_utils import canonical_url
+
+
+class Article:
+    """一条新闻
+
+    published为带时区的发布时间(datetime)，未知时为None；date为显示用的"%m月%d日"，未指定时由published生成，都没有时取当天；
+    priority由选择阶段按新闻源填入；sources为报道了该文章的源，去重时被合并的文章把自己的源记录在保留的文章上。
+    """
+
+    __slots__ = ("title", "link", "source", "published", "date", "priority", "canonical_link", "title_key", "sources")
+
+    def __init__(self, title, link, source, published=None, date=None, priority=None):
+        self.title = title.strip()
+        self.link = link.strip()
+        self.source = source
+        self.published = published
+        self.date = date or format_date(published)
+        self.priority = priority
+        self.canonical_link = canonical_url(self.link)
+        # 去重键：合并连续空白、忽略大小写（字符串会缓存自身的哈希值，集合查找时不再重复计算）
+        self.title_key = " ".join(self.title.split()).casefold()
+        # 报道了同一篇文章或同一事件的源（含自身），由去重阶段填入
+        self.sources = [source]
+
+    @property
+    def coverage(self):
+        """报道该文章（或同一事件）的源数量"""
+        return len(self.sources)
+
+    def add_source(self, source):
+        """记录另一个源也报道了该文章"""
+        if source not in self.sources:
+            self.sources.append(source)
+
+    def __repr__(self):
+        return f"Article({self.title!r}, {self.link!r}, {self.source!r}, date={self.date!r})"
+
+    def to_row(self):
+        """紧凑的可JSON序列化形式，用于缓存"""
+        published = None
+        if self.published:
+            # 只有日期的发布时间只保存日期，恢复时仍按日期精度处理
+            published = self.published.date().isoformat() if is_date_only(self.published) else self.published.isoformat()
+        return [self.title, self.link, self.source, self.date, published]
+
+    @classmethod
+    def from_row(cls, row):
+        """从to_row()的结果恢复；也接受旧版缓存中的文章字典"""
+        if isinstance(row, dict):
+            return cls(row["title"], row["link"], row.get("source", ""), date=row.get("date"))
+        title, link, source, date, published = row
+        return cls(title, link, source, published=parse_datetime(published), date=date)
@@ -0,0 +1,176 @@
+# 流式文章选择
+# 抓取结果按新闻源的优先级顺序逐个流入，依次经过"规范化(每源截断、标记优先级)→标题过滤→标题/链接去重→时间窗口过滤→近似去重→
+# 按优先级配额选择"
+# 各阶段都是生成器，下游按需拉取，中间不保存完整列表；总数配额满后选择阶段停止拉取，上游随之停止。
+# 配额计数(PriorityQuota)同时提供给抓取阶段，用于判断尚未完成的源是否还可能影响结果。
+
+from collections import defaultdict
+from datetime import timedelta
+
+import date_parsing
+import sent_history
+from config import (MAX_ARTICLES_PER_SOURCE, MAX_TOTAL_ARTICLES, MAX_ARTICLES_PER_PRIORITY, NEAR_DUPLICATE_ENABLED,
+                    RECENCY_FILTER_ENABLED, RECENCY_WINDOW_HOURS)
+from near_duplicates import NearDuplicateIndex, entities, minhash, shingles
+from url_utils import is_article_link
+
+
+class PriorityQuota:
+    """各优先级和总数的配额计数
+
+    sources须已按优先级从高到低排序；选择阶段通过try_take占用配额，抓取阶段通过cutoff判断剩余的源是否还有意义。
+    """
+
+    def __init__(self, sources, total=MAX_TOTAL_ARTICLES, per_priority=MAX_ARTICLES_PER_PRIORITY):
+        self.total = total
+        self.per_priority = per_priority
+        self.counts = defaultdict(int)
+        self.taken = 0
+        priorities = [source.get("priority", 3) for source in sources]
+        # suffix_priorities[i]: 第i个及之后的源涉及的优先级集合
+        self.suffix_priorities = [set() for _ in range(len(sources) + 1)]
+        for index in range(len(sources) - 1, -1, -1):
+            self.suffix_priorities[index] = self.suffix_priorities[index + 1] | {priorities[index]}
+
+    def is_full(self, priority):
+        return self.counts[priority] >= self.per_priority.get(priority, 4)
+
+    @property
+    def done(self):
+        return self.taken >= self.total
+
+    def try_take(self, priority):
+        """该优先级和总数都还有配额时占用一个并返回True"""
+        if self.done or self.is_full(priority):
+            return False
+        self.counts[priority] += 1
+        self.taken += 1
+        return True
+
+    def cutoff(self, next_index):
+        """前next_index个源已全部选择完毕时，返回最小的源位置i(>=next_index)，使第i个及之后的源无论结果如何
+        都不会改变输出；不存在时返回None
+
+        总数已满时之后的源都无关；否则只有之后的源涉及的优先级配额都已满时才无关——
+        配额已满的源虽然不会被选中，但其文章仍可能（近似）去重掉更低优先级源中的同一篇文章。
+        """
+        if self.done:
+            return next_index
+        for index in range(next_index, len(self.suffix_priorities) - 1):
+            if all(self.is_full(priority) for priority in self.suffix_priorities[index]):
+                return index
+        return None
+
+
+def normalize_articles(source_results, sources, per_source=MAX_ARTICLES_PER_SOURCE):
+    """规范化阶段: 接收按源顺序到达的(源位置, 文章列表)，每源截断到per_source条并标记优先级，逐条产出"""
+    for index, articles in source_results:
+        priority = sources[index].get("priority", 3)
+        for article in articles[:per_source]:
+            article.priority = priority
+            yield article
+
+
+def filter_articles(articles, min_title_length=10):
+    """过滤阶段: 去掉标题过短的文章"""
+    for article in articles:
+        if len(article.title) > min_title_length:
+            yield article
+
+
+class DedupeIndex:
+    """按规范链接和标题去重的哈希索引，任一键已出现过即视为重复
+
+    没有主机名或只是站点首页的链接（解析不出文章地址时的占位）不作为键，避免把不同文章误判为重复。
+    """
+
+    def __init__(self):
+        self.titles = {}
+        self.links = {}
+
+    def add(self, article):
+        """文章未出现过时登记其标题和链接并返回True；重复时在先到的文章上记录来源并返回False"""
+        link_key = article.canonical_link if is_article_link(article.canonical_link) else None
+        existing = self.titles.get(article.title_key) or (link_key and self.links.get(link_key))
+        if existing:
+            existing.add_source(article.source)
+            return False
+        self.titles[article.title_key] = article
+        if link_key:
+            self.links[link_key] = article
+        return True
+
+
+def dedupe_articles(articles, index=None):
+    """去重阶段: 标题或规范链接相同的文章只保留先到达（优先级更高）的一条
+
+    同一篇文章经不同源（如网页和RSS）到达时标题可能略有差异、链接带不同的跟踪参数，规范链接可以识别出来。
+    """
+    index = index or DedupeIndex()
+    for article in articles:
+        if index.add(article):
+            yield article
+
+
+def recent_articles(articles, window_hours=RECENCY_WINDOW_HOURS, was_sent=sent_history.was_sent):
+    """时间窗口阶段: 去掉发布时间早于window_hours小时之前的文章；没有发布时间的文章查询已发送记录，发送过的视为旧闻
+
+    只有日期的发布时间按日历日期比较：窗口起点所在的那一天及之后的文章都保留。
+
+    只比较已解析的时间和查一次字典，放在近似去重和配额选择之前，旧闻不再占用配额和提示词篇幅。
+    """
+    cutoff = date_parsing.now() - timedelta(hours=window_hours)
+    cutoff_date = cutoff.date()
+    for article in articles:
+        published = article.published
+        if published is not None:
+            if date_parsing.is_date_only(published):
+                if published.date() >= cutoff_date:
+                    yield article
+            elif published >= cutoff:
+                yield article
+        elif not was_sent(article):
+            yield article
+
+
+def cluster_articles(articles, index=None):
+    """近似去重阶段: 标题相似的文章视为同一事件，只保留先到达（优先级最高）的一条作为代表，
+    其余文章的源记录在代表的sources中
+
+    代表产出后，之后到达的相似文章仍会更新其sources；选择阶段结束后不再拉取上游，之后的源不计入。
+    """
+    index = index or NearDuplicateIndex()
+    for article in articles:
+        features = shingles(article.title)
+        signature = minhash(features)
+        title_entities = entities(article.title)
+        representative = index.find(features, signature, title_entities)
+        if representative is not None:
+            for source in article.sources:
+                representative.add_source(source)
+            continue
+        index.add(article, features, signature, title_entities)
+        yield article
+
+
+def select_articles(articles, quota):
+    """选择阶段: 按优先级配额选择文章，总数配额满后停止拉取上游"""
+    if quota.done:
+        return
+    for article in articles:
+        if quota.try_take(article.priority):
+            yield article
+            if quota.done:
+                return
+
+
+def build_pipeline(source_results, sources, quota):
+    """组装完整的流式选择管道，返回产出最终文章的生成器"""
+    articles = normalize_articles(source_results, sources)
+    articles = filter_articles(articles)
+    articles = dedupe_articles(articles)
+    if RECENCY_FILTER_ENABLED:
+        articles = recent_articles(articles)
+    if NEAR_DUPLICATE_ENABLED:
+        articles = cluster_articles(articles)
+    return select_articles(articles, quota)
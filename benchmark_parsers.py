@@ -0,0 +1,96 @@
+# HTML解析后端基准测试
+# 对每个HTML新闻源，分别用各解析后端测量构建完整DOM树的耗时和该源解析函数的耗时（含限定范围解析），
+# 用于决定HTML_PARSER和各源的"html_parser"字段。
+#
+# 用法:
+#   python benchmark_parsers.py                     # 在线抓取各静态源页面后测试
+#   python benchmark_parsers.py --dir pages         # 使用pages目录下保存的"<源名称>.html"（机器之心需保存渲染后的页面）
+#   python benchmark_parsers.py --repeat 20 --source 36氪
+
+import argparse
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+import html_backend
+import http_client
+from main import STATIC_SOURCE_PARSERS, parse_jiqizhixin_dom
+from config import NEWS_SOURCES
+
+# 源名称 -> 解析函数
+SOURCE_PARSERS = {name: parser for name, (headers, parser) in STATIC_SOURCE_PARSERS.items()}
+SOURCE_PARSERS["机器之心"] = parse_jiqizhixin_dom
+
+
+def load_page(source, page_dir=None):
+    """读取保存的页面，没有指定目录时在线抓取；无法获取时返回None"""
+    if page_dir:
+        path = os.path.join(page_dir, f"{source['name']}.html")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    if source["name"] not in STATIC_SOURCE_PARSERS:
+        # 需要浏览器渲染的页面只能使用保存的文件
+        return None
+    headers = STATIC_SOURCE_PARSERS[source["name"]][0]
+    try:
+        response = http_client.get(source["url"], headers=headers)
+        response.raise_for_status()
+        return response.text
+    except Exception as e:
+        print(f"   {source['name']}: 获取页面失败: {e}")
+        return None
+
+
+def best_time(func, repeat):
+    """重复执行repeat次，返回最短耗时（毫秒）和最后一次的结果"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def benchmark_source(source_name, html, parser, repeat):
+    """返回各后端的(完整建树耗时, 解析函数耗时, 文章数)"""
+    results = {}
+    for backend in html_backend.BACKENDS:
+        if backend == "lxml" and not html_backend.LXML_AVAILABLE:
+            continue
+        full_ms, _ = best_time(lambda: BeautifulSoup(html, backend), repeat)
+        with html_backend.forced_backend(backend):
+            parse_ms, articles = best_time(lambda: parser(html, source_name), repeat)
+        results[backend] = (full_ms, parse_ms, len(articles))
+    return results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="HTML解析后端基准测试")
+    arg_parser.add_argument("--dir", help="保存页面的目录，文件名为<源名称>.html；不指定时在线抓取")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="每项测试的重复次数，取最短耗时")
+    arg_parser.add_argument("--source", action="append", help="只测试指定的源，可重复指定")
+    args = arg_parser.parse_args()
+
+    if not html_backend.LXML_AVAILABLE:
+        print("未安装lxml，只测试html.parser（pip install lxml）")
+
+    print(f"{'新闻源':<14}{'后端':<13}{'页面大小':>10}{'完整建树':>12}{'解析函数':>12}{'文章数':>8}")
+    for source in NEWS_SOURCES:
+        source_name = source["name"]
+        if source_name not in SOURCE_PARSERS or (args.source and source_name not in args.source):
+            continue
+        html = load_page(source, args.dir)
+        if html is None:
+            continue
+        results = benchmark_source(source_name, html, SOURCE_PARSERS[source_name], args.repeat)
+        for backend, (full_ms, parse_ms, count) in results.items():
+            print(f"{source_name:<14}{backend:<13}{len(html) // 1024:>8}KB{full_ms:>10.1f}ms{parse_ms:>10.1f}ms{count:>8}")
+
+
+if __name__ == "__main__":
+    main()
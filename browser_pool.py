@@ -0,0 +1,314 @@
+# 无头Chrome浏览器池
+# 预热N个无头Chrome实例并租借给需要渲染的新闻源，避免每次抓取都重新启动浏览器；
+# 实例渲染K个页面或内存超过阈值后回收重建，进程退出时统一关闭。
+# 渲染时使用eager加载策略，并通过DevTools拦截图片、样式、字体和追踪脚本等非必要资源。
+
+import atexit
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support.ui import WebDriverWait
+
+import retry_policy
+from config import (CHROME_BINARY_PATH, CHROMEDRIVER_PATH, BROWSER_POOL_SIZE, BROWSER_MAX_PAGES,
+                    BROWSER_MAX_MEMORY_MB, BROWSER_LEASE_TIMEOUT, BROWSER_PAGE_LOAD_TIMEOUT,
+                    BROWSER_EAGER_PAGE_LOAD, BROWSER_BLOCK_RESOURCES, BROWSER_BLOCKED_RESOURCE_TYPES,
+                    BROWSER_BLOCKED_URL_PATTERNS, BROWSER_READY_MIN_ANCHORS, BROWSER_READY_TIMEOUT)
+
+# psutil为可选依赖，用于统计浏览器进程树内存
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+CHROME_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+CHROME_ARGUMENTS = [
+    "--headless",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-dev-tools-bridge",
+    "--disable-extensions",
+    "--disable-plugins",
+    "--disable-images",
+    "--disable-javascript-har-promises",
+    "--disable-web-security",
+    "--no-first-run",
+    "--disable-default-apps",
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-features=TranslateUI",
+    "--disable-ipc-flooding-protection",
+    f"--user-agent={CHROME_USER_AGENT}",
+]
+
+
+# 资源类型 -> DevTools拦截用的URL匹配模式
+RESOURCE_TYPE_PATTERNS = {
+    "image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico"],
+    "stylesheet": ["*.css"],
+    "font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "media": ["*.mp4", "*.webm", "*.mp3", "*.m4a", "*.m3u8"],
+}
+
+
+def build_chrome_options():
+    """构建所有浏览器实例共用的Chrome启动参数"""
+    chrome_options = Options()
+    for argument in CHROME_ARGUMENTS:
+        chrome_options.add_argument(argument)
+    chrome_options.binary_location = CHROME_BINARY_PATH
+    if BROWSER_EAGER_PAGE_LOAD:
+        # DOM解析完成即返回，不等待图片、样式表等子资源
+        chrome_options.page_load_strategy = "eager"
+    return chrome_options
+
+
+def build_blocked_url_patterns():
+    """根据配置的资源类型和追踪/广告域名生成拦截模式"""
+    patterns = []
+    for resource_type in BROWSER_BLOCKED_RESOURCE_TYPES:
+        for pattern in RESOURCE_TYPE_PATTERNS.get(resource_type, []):
+            # 同时匹配带查询参数的地址，如 style.css?v=1
+            patterns.extend([pattern, pattern + "?*"])
+    patterns.extend(BROWSER_BLOCKED_URL_PATTERNS)
+    return patterns
+
+
+def enable_resource_blocking(driver):
+    """通过DevTools协议拦截非必要资源请求，返回是否启用成功"""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": build_blocked_url_patterns()})
+        return True
+    except Exception:
+        return False
+
+
+def content_ready(selector=None, min_anchors=BROWSER_READY_MIN_ANCHORS):
+    """等待条件：目标元素出现，或页面中链接数量达到min_anchors"""
+    def condition(driver):
+        if selector and driver.find_elements(*selector):
+            return True
+        if min_anchors:
+            return driver.execute_script("return document.querySelectorAll('a[href]').length") >= min_anchors
+        return False
+    return condition
+
+
+class _PooledBrowser:
+    """池中的一个浏览器实例及其使用计数"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.monotonic()
+
+
+class BrowserPool:
+    """无头Chrome实例池，通过lease()租借实例"""
+
+    def __init__(self, size=BROWSER_POOL_SIZE, max_pages=BROWSER_MAX_PAGES,
+                 max_memory_mb=BROWSER_MAX_MEMORY_MB, logger=None):
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.logger = logger
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._total = 0
+        self._closed = False
+
+    def _log(self, level, message):
+        if self.logger:
+            getattr(self.logger, level)(message)
+
+    def _launch(self):
+        """启动一个新的浏览器实例"""
+        started = time.monotonic()
+        driver = webdriver.Chrome(service=Service(executable_path=CHROMEDRIVER_PATH), options=build_chrome_options())
+        if BROWSER_PAGE_LOAD_TIMEOUT:
+            driver.set_page_load_timeout(BROWSER_PAGE_LOAD_TIMEOUT)
+        if BROWSER_BLOCK_RESOURCES and not enable_resource_blocking(driver):
+            self._log("warning", "无法通过DevTools启用资源拦截，将加载完整页面")
+        self._log("debug", f"Chrome实例启动完成，耗时 {time.monotonic() - started:.1f}秒")
+        return _PooledBrowser(driver)
+
+    def _reserve_slot(self):
+        """在实例数未达上限时占用一个名额"""
+        with self._lock:
+            if self._closed or self._total >= self.size:
+                return False
+            self._total += 1
+            return True
+
+    def _release_slot(self):
+        with self._lock:
+            self._total -= 1
+
+    def _start_one(self):
+        if not self._reserve_slot():
+            return
+        try:
+            self._idle.put(self._launch())
+        except Exception as e:
+            self._release_slot()
+            self._log("error", f"预热Chrome实例失败: {e}")
+
+    def warm_up(self, wait=False):
+        """在后台并行启动实例直到达到池大小，wait为True时等待启动完成"""
+        threads = [threading.Thread(target=self._start_one, name="browser-warmup", daemon=True)
+                   for _ in range(self.size)]
+        for thread in threads:
+            thread.start()
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def _acquire(self, timeout):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        if self._reserve_slot():
+            try:
+                return self._launch()
+            except Exception:
+                self._release_slot()
+                raise
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutException(f"等待空闲浏览器实例超时({timeout}秒)")
+
+    def _memory_mb(self, browser):
+        """估算实例内存占用(MB)，无法获取时返回0"""
+        try:
+            if PSUTIL_AVAILABLE:
+                process = psutil.Process(browser.driver.service.process.pid)
+                processes = [process] + process.children(recursive=True)
+                return sum(p.memory_info().rss for p in processes) / 1048576
+            used = browser.driver.execute_script(
+                "return (window.performance && performance.memory) ? performance.memory.usedJSHeapSize : 0")
+            return (used or 0) / 1048576
+        except Exception:
+            return 0
+
+    def _retire(self, browser, reason):
+        self._log("debug", f"回收Chrome实例({reason})，已渲染 {browser.pages} 个页面")
+        try:
+            browser.driver.quit()
+        except Exception:
+            pass
+        self._release_slot()
+
+    def _release(self, browser, healthy):
+        if self._closed:
+            self._retire(browser, "浏览器池已关闭")
+        elif not healthy:
+            self._retire(browser, "实例异常")
+        elif self.max_pages and browser.pages >= self.max_pages:
+            self._retire(browser, f"达到 {self.max_pages} 个页面")
+        elif self.max_memory_mb and self._memory_mb(browser) > self.max_memory_mb:
+            self._retire(browser, f"内存超过 {self.max_memory_mb}MB")
+        else:
+            self._idle.put(browser)
+
+    @contextmanager
+    def lease(self, timeout=BROWSER_LEASE_TIMEOUT):
+        """租借一个浏览器实例，退出上下文时归还或回收"""
+        browser = self._acquire(timeout)
+        healthy = True
+        try:
+            yield browser.driver
+        except TimeoutException:
+            raise
+        except WebDriverException:
+            healthy = False
+            raise
+        finally:
+            browser.pages += 1
+            self._release(browser, healthy)
+
+    def shutdown(self):
+        """关闭池中所有空闲实例，正在使用的实例归还时关闭"""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                browser = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._retire(browser, "浏览器池关闭")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def render_page(url, ready_selector=None, min_anchors=BROWSER_READY_MIN_ANCHORS,
+                ready_timeout=BROWSER_READY_TIMEOUT, logger=None):
+    """用池中的浏览器渲染页面并返回源码
+
+    ready_selector为(By, 值)形式的定位器；目标元素出现或链接数量达到min_anchors即视为就绪，
+    最多等待ready_timeout秒，超时后仍返回当前已渲染的DOM。
+    在新闻源的截止时间内渲染时，页面加载和就绪等待都不超过剩余时间。
+    """
+    with get_browser_pool(logger).lease() as driver:
+        # 实例在多次渲染间复用，每次都重新设置页面加载超时（未配置时使用WebDriver默认的300秒）
+        page_load_timeout = BROWSER_PAGE_LOAD_TIMEOUT or 300
+        remaining = retry_policy.remaining_time()
+        if remaining is not None:
+            remaining = max(remaining, 1)
+            page_load_timeout = min(page_load_timeout, remaining)
+        driver.set_page_load_timeout(page_load_timeout)
+        if logger: logger.debug(f"正在访问页面: {url}")
+        try:
+            driver.get(url)
+        except TimeoutException:
+            # 页面加载超时时停止加载，使用已解析的部分DOM
+            if logger: logger.warning(f"页面加载超时，使用已加载的内容: {url}")
+            try:
+                driver.execute_script("window.stop();")
+            except Exception:
+                pass
+
+        started = time.monotonic()
+        if remaining is not None:
+            ready_timeout = max(min(ready_timeout, retry_policy.remaining_time()), 1)
+        try:
+            WebDriverWait(driver, ready_timeout, poll_frequency=0.2).until(content_ready(ready_selector, min_anchors))
+            if logger: logger.debug(f"页面内容就绪，等待 {time.monotonic() - started:.1f}秒")
+        except TimeoutException:
+            if logger: logger.warning(f"等待页面内容就绪超时({ready_timeout}秒)，使用当前DOM继续处理")
+        return driver.page_source
+
+
+def get_browser_pool(logger=None):
+    """获取进程级共享的浏览器池"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool._closed:
+            _pool = BrowserPool(logger=logger)
+        elif logger and _pool.logger is None:
+            _pool.logger = logger
+        return _pool
+
+
+def shutdown_browser_pool():
+    """关闭共享浏览器池"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+atexit.register(shutdown_browser_pool)
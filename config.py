@@ -1,6 +1,8 @@
 # 新闻源配置文件
 # 可以在这里添加、修改或删除新闻源
 
+# 可选字段 "feed": 填写RSS/Atom地址表示固定通过该订阅获取；设为False表示禁用该源的订阅自动发现
+# 可选字段 "html_parser": 该源页面使用的HTML解析后端（"lxml"或"html.parser"），未填写时使用HTML_PARSER
 NEWS_SOURCES = [
     # 中文新闻源 (优先级: 1-5, 5最高)
     {"url": "https://36kr.com", "name": "36氪", "enabled": True, "priority": 5},
@@ -19,6 +21,9 @@ NEWS_SOURCES = [
     {"url": "https://www.artificialintelligence-news.com/feed/", "name": "AI News RSS", "enabled": True, "priority": 2},
     {"url": "https://www.mit.edu/~jintao/ai_news.xml", "name": "MIT AI News RSS", "enabled": True, "priority": 2},
 
+    # 站点地图源 (名称以Sitemap结尾，读取Google News站点地图，只获取上次运行之后更新的条目)
+    # {"url": "https://example.com/news-sitemap.xml", "name": "Example Sitemap", "enabled": False, "priority": 3},
+
     # API源 (需要API密钥)
     # {"url": "https://newsapi.org/v2/everything?q=artificial+intelligence&language=en&sortBy=publishedAt&apiKey=YOUR_API_KEY", "name": "NewsAPI", "enabled": False, "priority": 3},
     # {"url": "https://gnews.io/api/v4/search?q=artificial+intelligence&token=YOUR_API_KEY", "name": "GNews API", "enabled": False, "priority": 3},
@@ -37,14 +42,86 @@ MAX_ARTICLES_PER_PRIORITY = {  # 每个优先级最多返回的文章数量
 }
 AI_KEYWORDS = [
     "ai", "artificial intelligence", "machine learning", "deep learning", "neural", 
-    "algorithm", "model", "chatgpt", "openai", "gpt", "transformer", "llm",
+    "algorithm", "model", "chatgpt", "openai", "gpt", "transformer", "llm", "aigc", "genai",
     "人工智能", "机器学习", "深度学习", "智能", "算法", "大模型", "神经网络"
 ]
+KEYWORD_BOUNDARY_MAX_LENGTH = 3  # 不超过该长度的纯英文关键词（如"ai"、"gpt"）只按完整单词匹配
+NEAR_DUPLICATE_ENABLED = True     # 合并不同源对同一事件的近似重复报道，只保留优先级最高的一条
+NEAR_DUPLICATE_THRESHOLD = 0.5    # 标题特征（单字/单词及相邻词对）的Jaccard相似度达到该值视为同一事件
+NEWS_TIMEZONE = "Asia/Shanghai"   # 没有时区信息的发布时间按该时区处理，显示日期也使用该时区
+RECENCY_FILTER_ENABLED = True     # 配额选择前去掉时间窗口之外的旧闻
+RECENCY_WINDOW_HOURS = 24         # 时间窗口（小时）：发布时间早于该时长之前的文章不参与选择
+SENT_HISTORY_DAYS = 7             # 已发送记录保留天数，没有发布时间的文章发送过即视为旧闻
 
 # 请求配置
 REQUEST_TIMEOUT = 30  # 请求超时时间（秒）
 RETRY_COUNT = 3      # 重试次数
-RETRY_DELAY = 2      # 重试间隔（秒）
+RETRY_DELAY = 2      # 重试间隔（秒），之后每次重试翻倍并加随机抖动
+RETRY_MAX_DELAY = 30  # 单次重试等待时间上限（秒），也是服务器Retry-After的上限
+RETRY_BUDGET = 30     # 每次运行所有请求共享的重试（含对冲请求）总次数，防止故障时形成重试风暴
+HTTP_HEDGE_ENABLED = True    # GET请求耗时超过该主机历史延迟分位数时再发一个对冲请求，取先返回者
+HTTP_HEDGE_PERCENTILE = 95   # 触发对冲请求的延迟分位数
+HTTP_HEDGE_MIN_SAMPLES = 5   # 主机至少积累这么多次延迟样本后才启用对冲
+HTTP_CONNECT_TIMEOUT = 10   # 建立连接的超时时间（秒），读取超时使用REQUEST_TIMEOUT
+HTTP_POOL_CONNECTIONS = 10  # 每个共享会话缓存的连接池数量
+HTTP_POOL_MAXSIZE = 10      # 每个主机连接池保持的最大连接数（keep-alive）
+HTTP_CACHE_ENABLED = True   # 启用条件请求缓存（ETag/Last-Modified），内容未变化时复用上次解析的文章
+HTTP_CACHE_DIR = "cache/http"  # 条件请求缓存目录
+HTTP_CACHE_RENDERED_MAX_AGE = 6 * 3600  # 浏览器渲染源（及其静态层级）缓存的最长复用时间（秒）：页面外壳的校验值不随脚本加载的列表变化，超过后强制重新抓取
+SOURCE_STATE_FILE = "cache/source_state.json"  # 跨运行保存的新闻源状态（抓取层级等）
+
+# 分层抓取配置（通用源先静态抓取，不足时再用浏览器渲染）
+GENERIC_STATIC_MIN_ARTICLES = 3  # 静态抓取至少得到这么多文章才不升级到浏览器渲染
+FETCH_TIER_RECHECK_DAYS = 7      # 记住"浏览器渲染"层级的天数，到期后重新尝试静态抓取
+
+# 订阅自动发现配置（HTML源页面声明了RSS/Atom订阅时改用RSS方式获取）
+FEED_DISCOVERY_ENABLED = True   # 是否启用订阅自动发现
+FEED_DISCOVERY_TTL_DAYS = 7     # 发现结果的缓存天数，到期后重新从页面中发现
+FEED_REJECT_TTL_DAYS = 30       # 订阅没有返回文章时，该地址在这么多天内不再被采用（重新发现时也跳过）
+
+# 站点地图源配置
+SITEMAP_MAX_CHILDREN = 20       # 站点地图索引中最多读取的子站点地图数量
+
+# HTML解析配置
+HTML_PARSER = "lxml"            # 默认HTML解析后端，未安装lxml时自动使用html.parser
+
+# 新闻源健康度与熔断配置（状态保存在SOURCE_STATE_FILE中）
+CIRCUIT_BREAKER_ENABLED = True  # 是否启用熔断，跳过连续失败或长期没有产出的源
+CIRCUIT_FAILURE_THRESHOLD = 3   # 连续失败（出错或超时）这么多次后打开熔断
+HEALTH_ZERO_YIELD_DAYS = 7      # 这么多天没有产出文章的源打开熔断
+CIRCUIT_COOLDOWN_HOURS = 23     # 熔断冷却时间（小时），略小于一天，保证每日任务在冷却结束后的第一次运行就会探测
+CIRCUIT_MAX_COOLDOWN_HOURS = 168  # 探测失败后冷却时间加倍，最长不超过一周
+HEALTH_HISTORY_SIZE = 30        # 每个源保留的最近抓取记录数量
+
+# 并发抓取配置
+FETCH_MAX_WORKERS = 6         # 并发抓取新闻源的线程数
+SOURCE_FETCH_TIMEOUT = 45     # 单个新闻源的抓取截止时间（秒），从该源开始抓取时计时
+FETCH_GLOBAL_TIMEOUT = 90     # 整个抓取阶段的截止时间（秒），超时后未完成的源将被放弃
+ADAPTIVE_TIMEOUT_ENABLED = True      # 根据各源的历史耗时自动收紧单源截止时间
+ADAPTIVE_TIMEOUT_PERCENTILE = 95     # 取最近成功抓取耗时的该分位数
+ADAPTIVE_TIMEOUT_FACTOR = 2.0        # 在分位数耗时基础上留出的余量倍数
+ADAPTIVE_TIMEOUT_MIN_SAMPLES = 5     # 至少有这么多次成功记录才启用自适应截止时间
+ADAPTIVE_TIMEOUT_FLOOR = 3           # 自适应截止时间下限（秒）
+ADAPTIVE_TIMEOUT_CEILING = SOURCE_FETCH_TIMEOUT  # 自适应截止时间上限（秒）
+FETCH_MAX_PER_HOST = 2       # 同一主机同时抓取的新闻源数，超出的源在线程中排队等待
+
+# 浏览器池配置（用于需要渲染的新闻源，如机器之心）
+CHROME_BINARY_PATH = "/usr/bin/google-chrome-stable"  # Chrome可执行文件路径
+CHROMEDRIVER_PATH = "/usr/bin/chromedriver"           # chromedriver路径
+BROWSER_POOL_SIZE = 2           # 预热的无头Chrome实例数量
+BROWSER_MAX_PAGES = 20          # 每个实例渲染多少个页面后回收重建
+BROWSER_MAX_MEMORY_MB = 800     # 实例进程树内存超过该值(MB)后回收重建，0表示不检查
+BROWSER_LEASE_TIMEOUT = 60      # 等待空闲实例的最长时间（秒）
+BROWSER_PAGE_LOAD_TIMEOUT = 30  # 单个页面加载超时时间（秒）
+BROWSER_EAGER_PAGE_LOAD = True  # 使用eager加载策略，DOM解析完成即返回，不等待子资源
+BROWSER_BLOCK_RESOURCES = True  # 通过DevTools拦截非必要资源，减少下载量
+BROWSER_BLOCKED_RESOURCE_TYPES = ["image", "stylesheet", "font", "media"]  # 拦截的资源类型
+BROWSER_BLOCKED_URL_PATTERNS = [  # 额外拦截的追踪/广告地址
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*hm.baidu.com*", "*cnzz.com*", "*facebook.net*", "*scorecardresearch.com*",
+]
+BROWSER_READY_MIN_ANCHORS = 20  # 页面中出现至少这么多链接即视为内容就绪
+BROWSER_READY_TIMEOUT = 10      # 等待内容就绪的硬上限（秒）
 
 # 定时任务配置已移除，使用系统cron或systemd timer进行定时任务管理
 
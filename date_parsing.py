@@ -0,0 +1,198 @@
+# 日期解析
+# 各抓取函数统一通过parse_datetime把发布时间解析为带时区的datetime：
+# 支持datetime、时间戳（秒/毫秒）、feedparser的published_parsed(struct_time)，以及字符串形式的
+# ISO 8601（快速路径）、RFC 822、"2025年6月10日"/"6月10日"/"06-10 10:30"等中文页面常见格式，
+# 和"刚刚"、"3小时前"、"昨天 10:30"、"2 days ago"等相对时间。
+# 没有时区的时间按NEWS_TIMEZONE处理；同一字符串在同一分钟内只解析一次（lru_cache）。
+# 只有日期没有时刻的值（"6月10日"、"昨天"、"2025-06-10"）解析为当天零点的DateOnly，按日历日期比较新旧。
+
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+
+from config import NEWS_TIMEZONE
+
+try:
+    from zoneinfo import ZoneInfo
+    LOCAL_TIMEZONE = ZoneInfo(NEWS_TIMEZONE)
+except Exception:
+    # 没有时区数据库时使用东八区
+    LOCAL_TIMEZONE = timezone(timedelta(hours=8))
+
+DISPLAY_FORMAT = "%m月%d日"
+ISO_DATE_LENGTH = len("2025-06-10")
+
+ISO_DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}")
+SLASH_DATE_PATTERN = re.compile(r"^(\d{4})/(\d{1,2})/(\d{1,2})(?:[ T](\d{1,2}):(\d{2})(?::(\d{2}))?)?")
+CHINESE_DATE_PATTERN = re.compile(
+    r"(?:(\d{4})\s*年\s*)?(\d{1,2})\s*月\s*(\d{1,2})\s*日(?:\s*(\d{1,2})[:：](\d{2}))?")
+SHORT_DATE_PATTERN = re.compile(r"^(\d{1,2})-(\d{1,2})(?:\s+(\d{1,2}):(\d{2}))?$")
+RELATIVE_PATTERN = re.compile(
+    r"(\d+)\s*(秒|分钟|分|小时|天|周|second|minute|min|hour|hr|day|week)s?\s*(?:前|ago)", re.IGNORECASE)
+DAY_WORD_PATTERN = re.compile(r"^(刚刚|今天|昨天|前天|just now|today|yesterday)\s*(?:(\d{1,2})[:：](\d{2}))?",
+                              re.IGNORECASE)
+
+RELATIVE_UNITS = {
+    "秒": 1, "second": 1,
+    "分钟": 60, "分": 60, "minute": 60, "min": 60,
+    "小时": 3600, "hour": 3600, "hr": 3600,
+    "天": 86400, "day": 86400,
+    "周": 604800, "week": 604800,
+}
+DAY_OFFSETS = {"刚刚": 0, "just now": 0, "今天": 0, "today": 0, "昨天": 1, "yesterday": 1, "前天": 2}
+
+
+class DateOnly(datetime):
+    """只精确到日期的时间，取NEWS_TIMEZONE当天零点"""
+
+
+def is_date_only(value):
+    return isinstance(value, DateOnly)
+
+
+def _date_only(year, month, day):
+    return DateOnly(year, month, day, tzinfo=LOCAL_TIMEZONE)
+
+
+def now():
+    """当前时间（NEWS_TIMEZONE）"""
+    return datetime.now(LOCAL_TIMEZONE)
+
+
+def ensure_aware(value):
+    """没有时区的datetime按NEWS_TIMEZONE处理"""
+    return value.replace(tzinfo=LOCAL_TIMEZONE) if value.tzinfo is None else value
+
+
+def _from_timestamp(value):
+    timestamp = float(value)
+    # 毫秒时间戳
+    if timestamp > 1e11:
+        timestamp /= 1000
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+def _infer_year(month, day, hour, minute, reference, date_only=False):
+    """没有年份的日期取不晚于参考时间一天的最近一年；2月29日取最近的闰年，日期无效时抛出ValueError"""
+    latest = reference + timedelta(days=1)
+    # 2月29日最多要往前找8年（如2100年不是闰年）
+    for year in range(reference.year, reference.year - 9, -1):
+        try:
+            if date_only:
+                result = _date_only(year, month, day)
+            else:
+                result = datetime(year, month, day, hour, minute, tzinfo=LOCAL_TIMEZONE)
+        except ValueError:
+            continue
+        if result <= latest:
+            return result
+    raise ValueError(f"无效日期: {month}月{day}日")
+
+
+def _parse_relative(text, reference):
+    match = RELATIVE_PATTERN.search(text)
+    if match:
+        unit = match.group(2).lower()
+        return reference - timedelta(seconds=int(match.group(1)) * RELATIVE_UNITS[unit])
+    match = DAY_WORD_PATTERN.match(text)
+    if match:
+        word = match.group(1).lower()
+        if word in ("刚刚", "just now"):
+            return reference
+        day = reference - timedelta(days=DAY_OFFSETS[word])
+        if match.group(2):
+            return day.replace(hour=int(match.group(2)), minute=int(match.group(3)), second=0, microsecond=0)
+        # 只有日期时不能当作此刻发布
+        return _date_only(day.year, day.month, day.day)
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _parse_text(text, reference):
+    """解析字符串形式的时间；reference为截断到分钟的当前时间，作为缓存键的一部分，使相对时间在下一分钟重新计算"""
+    # ISO 8601快速路径
+    if ISO_DATE_PATTERN.match(text):
+        if len(text) == ISO_DATE_LENGTH:
+            try:
+                return _date_only(int(text[:4]), int(text[5:7]), int(text[8:10]))
+            except ValueError:
+                return None
+        try:
+            return ensure_aware(datetime.fromisoformat(text.replace("Z", "+00:00")))
+        except ValueError:
+            try:
+                parsed = datetime.strptime(text[:ISO_DATE_LENGTH], "%Y-%m-%d")
+                return _date_only(parsed.year, parsed.month, parsed.day)
+            except ValueError:
+                return None
+
+    match = SLASH_DATE_PATTERN.match(text)
+    if match:
+        year, month, day, hour, minute, second = (int(group or 0) for group in match.groups())
+        try:
+            if match.group(4) is None:
+                return _date_only(year, month, day)
+            return datetime(year, month, day, hour, minute, second, tzinfo=LOCAL_TIMEZONE)
+        except ValueError:
+            return None
+
+    # RFC 822（RSS的pubDate）
+    if text[:1].isalpha() or (text[:2].strip().isdigit() and " " in text):
+        try:
+            return ensure_aware(parsedate_to_datetime(text))
+        except (TypeError, ValueError, IndexError):
+            pass
+
+    relative = _parse_relative(text, reference)
+    if relative is not None:
+        return relative
+
+    match = CHINESE_DATE_PATTERN.search(text)
+    if match:
+        year, month, day, hour, minute = match.groups()
+        try:
+            if year and hour is None:
+                return _date_only(int(year), int(month), int(day))
+            if year:
+                return datetime(int(year), int(month), int(day), int(hour), int(minute), tzinfo=LOCAL_TIMEZONE)
+            return _infer_year(int(month), int(day), int(hour or 0), int(minute or 0), reference, hour is None)
+        except ValueError:
+            return None
+
+    match = SHORT_DATE_PATTERN.match(text)
+    if match:
+        month, day, hour, minute = (int(group or 0) for group in match.groups())
+        try:
+            return _infer_year(month, day, hour, minute, reference, match.group(3) is None)
+        except ValueError:
+            return None
+    return None
+
+
+def parse_datetime(value):
+    """把各种形式的发布时间解析为带时区的datetime，无法识别时返回None"""
+    if value is None or value == "":
+        return None
+    try:
+        if isinstance(value, datetime):
+            return ensure_aware(value)
+        if isinstance(value, time.struct_time):
+            # feedparser的*_parsed字段为UTC时间
+            return datetime(*value[:6], tzinfo=timezone.utc)
+        if isinstance(value, (int, float)) or (isinstance(value, str) and value.strip().isdigit()):
+            return _from_timestamp(value)
+    except (ValueError, OverflowError, OSError):
+        return None
+    if not isinstance(value, str):
+        return None
+    text = value.strip()
+    if not text:
+        return None
+    return _parse_text(text, now().replace(second=0, microsecond=0))
+
+
+def format_date(value=None):
+    """显示用的"%m月%d日"（NEWS_TIMEZONE），value为None时取当天"""
+    return (value.astimezone(LOCAL_TIMEZONE) if value else now()).strftime(DISPLAY_FORMAT)
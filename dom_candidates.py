@@ -0,0 +1,99 @@
+# 单次遍历的DOM候选索引
+# 机器之心、36氪的解析需要多轮find_all回退匹配，并且对每个候选元素再到父元素子树中查找日期；
+# 这里只遍历一次DOM树，同时收集全部链接、容器元素，以及每个元素子树中第一个日期文本/时间元素/链接，
+# 之后的回退匹配和日期查找都只是查表，不再重复遍历子树。
+
+import re
+
+from bs4 import NavigableString, Tag
+
+DATE_PATTERN = re.compile(r"\d{1,2}月\d{1,2}日")
+TIME_CLASS_PATTERN = re.compile(r"time|date")
+
+
+def has_class(tag, class_names):
+    """元素的class中是否包含class_names中的任意一个，与find_all(class_=[...])一致"""
+    return any(name in class_names for name in tag.get("class") or ())
+
+
+def class_matches(tag, pattern):
+    """元素的某个class（或完整class字符串）是否匹配正则，与find_all(class_=re.compile(...))一致"""
+    classes = tag.get("class") or ()
+    return any(pattern.search(name) for name in classes) or (len(classes) > 1 and bool(pattern.search(" ".join(classes))))
+
+
+def _mark_ancestors(node, table):
+    """把node记为其祖先"子树中第一个"匹配节点
+
+    按文档顺序调用时，遇到已有记录的祖先即可停止：更上层的祖先必然已记录了同一个或更早的节点。
+    """
+    parent = node.parent
+    while parent is not None and id(parent) not in table:
+        table[id(parent)] = node
+        parent = parent.parent
+
+
+class DomIndex:
+    """遍历一次DOM树建立的索引
+
+    anchors/containers为文档顺序的<a>元素和容器元素；first_*系列方法等价于在元素子树(不含自身)中执行find，
+    但只是查表。
+    """
+
+    def __init__(self, soup, container_names=("div",)):
+        self.anchors = []
+        self.containers = []
+        self._first_anchor = {}
+        self._first_time = {}
+        self._first_time_span = {}
+        self._first_date_text = {}
+        self._texts = {}
+
+        for node in soup.descendants:
+            if isinstance(node, Tag):
+                name = node.name
+                if name == "a":
+                    self.anchors.append(node)
+                    _mark_ancestors(node, self._first_anchor)
+                elif name == "time":
+                    _mark_ancestors(node, self._first_time)
+                elif name == "span" and class_matches(node, TIME_CLASS_PATTERN):
+                    _mark_ancestors(node, self._first_time_span)
+                if name in container_names:
+                    self.containers.append(node)
+            elif isinstance(node, NavigableString) and DATE_PATTERN.search(node):
+                _mark_ancestors(node, self._first_date_text)
+
+    def text(self, tag):
+        """元素的去空白文本，同一元素只计算一次"""
+        key = id(tag)
+        text = self._texts.get(key)
+        if text is None:
+            text = self._texts[key] = tag.get_text(strip=True)
+        return text
+
+    def first_anchor(self, element):
+        """等价于element.find("a")"""
+        return self._first_anchor.get(id(element))
+
+    def first_time_element(self, element):
+        """等价于element.find("time") or element.find("span", class_=re.compile(r"time|date"))"""
+        return self._first_time.get(id(element)) or self._first_time_span.get(id(element))
+
+    def first_date(self, element):
+        """element子树中第一个"X月X日"形式的日期，没有时返回None"""
+        node = self._first_date_text.get(id(element))
+        if node is None:
+            return None
+        match = DATE_PATTERN.search(str(node))
+        return match.group(0) if match else None
+
+
+def cascade(tiers, minimum=5):
+    """依次拼接各层候选，已有至少minimum个时不再计算后续层，与逐层find_all回退的结果一致"""
+    items = []
+    for tier in tiers:
+        if len(items) >= minimum:
+            break
+        items.extend(tier)
+    return items
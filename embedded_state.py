@@ -0,0 +1,87 @@
+# 内嵌状态提取
+# 许多JS渲染的页面会把文章列表以JSON形式内嵌在HTML中（如window.initialState、__NEXT_DATA__），
+# 直接解析这些数据即可得到文章，无需浏览器渲染或DOM启发式匹配。
+
+import json
+import re
+
+from article import Article
+from date_parsing import parse_datetime
+from url_utils import resolve_link
+
+# window.xxx = {...} 形式的状态赋值
+STATE_ASSIGNMENT_PATTERN = re.compile(
+    r"(?:window\.)?(?:__INITIAL_STATE__|initialState|__PRELOADED_STATE__|__APOLLO_STATE__|__NEXT_DATA__)\s*=\s*")
+# <script id="__NEXT_DATA__" type="application/json">{...}</script> 形式的状态脚本
+STATE_SCRIPT_PATTERN = re.compile(r"<script[^>]*\bid=[\"'](?:__NEXT_DATA__|__NUXT_DATA__)[\"'][^>]*>")
+
+TITLE_KEYS = ("title", "widgetTitle", "articleTitle", "headline")
+LINK_KEYS = ("url", "link", "href", "articleUrl", "shareUrl")
+DATE_KEYS = ("publishTime", "publishedAt", "published_at", "publishedTime", "publishDate",
+             "createdAt", "created_at", "date")
+
+_decoder = json.JSONDecoder()
+
+
+def extract_state_blobs(html):
+    """返回页面中所有可解析的内嵌JSON状态对象"""
+    blobs = []
+    positions = [m.end() for m in STATE_SCRIPT_PATTERN.finditer(html)]
+    positions += [m.end() for m in STATE_ASSIGNMENT_PATTERN.finditer(html)]
+    for position in positions:
+        # 跳过空白，JSON需从 { 或 [ 开始
+        while position < len(html) and html[position].isspace():
+            position += 1
+        if position >= len(html) or html[position] not in "{[":
+            continue
+        try:
+            blob, _ = _decoder.raw_decode(html, position)
+        except ValueError:
+            continue
+        blobs.append(blob)
+    return blobs
+
+
+def iter_article_items(node):
+    """深度优先遍历JSON，产出带有标题字段的字典"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            if any(isinstance(current.get(key), str) for key in TITLE_KEYS):
+                yield current
+            stack.extend(reversed([value for value in current.values() if isinstance(value, (dict, list))]))
+        elif isinstance(current, list):
+            stack.extend(reversed([value for value in current if isinstance(value, (dict, list))]))
+
+
+def parse_item_datetime(item):
+    """读取条目中的发布时间，无法识别时返回None"""
+    for key in DATE_KEYS:
+        published = parse_datetime(item.get(key))
+        if published is not None:
+            return published
+    return None
+
+
+def iter_articles(html, source_name, base_url, link_builder=None):
+    """从内嵌状态中逐条产出Article，调用方取够后即可停止，页面中没有内嵌状态时不产出任何文章
+
+    link_builder(item)用于从条目的id等字段构造链接，条目本身没有链接字段时使用。
+    """
+    seen_titles = set()
+    for blob in extract_state_blobs(html):
+        for item in iter_article_items(blob):
+            title = next((item[key] for key in TITLE_KEYS if isinstance(item.get(key), str)), "").strip()
+            if len(title) < 5 or title in seen_titles:
+                continue
+
+            link = next((item[key] for key in LINK_KEYS if isinstance(item.get(key), str) and item[key]), "")
+            if not link and link_builder:
+                link = link_builder(item) or ""
+            link = resolve_link(base_url, link)
+            if not link:
+                continue
+
+            seen_titles.add(title)
+            yield Article(title, link, source_name, published=parse_item_datetime(item))
@@ -0,0 +1,112 @@
+# RSS/Atom订阅自动发现
+# 在抓取HTML源页面时顺带查找<link rel="alternate">声明的订阅地址并缓存；
+# 之后的运行中，发现了订阅的源改用RSS方式获取，比解析HTML或浏览器渲染便宜得多。
+
+import posixpath
+import re
+import time
+from urllib.parse import urljoin, urlparse
+
+import source_state
+from config import FEED_DISCOVERY_ENABLED, FEED_DISCOVERY_TTL_DAYS, FEED_REJECT_TTL_DAYS
+
+FEED_TYPES = ("application/rss+xml", "application/atom+xml", "application/feed+json")
+LINK_TAG_PATTERN = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+ATTRIBUTE_PATTERN = re.compile(r"([a-zA-Z-]+)\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s>]+))")
+
+
+def discover_feed_urls(html, page_url):
+    """返回页面中声明的订阅地址，与页面路径相关的订阅排在前面，忽略评论订阅"""
+    # 订阅声明位于<head>中，只扫描</head>之前的内容
+    head_end = html.find("</head>")
+    head = html if head_end < 0 else html[:head_end]
+
+    page_path = urlparse(page_url).path.rstrip("/")
+    if "." in posixpath.basename(page_path):
+        # 页面是具体文件(如index.html)时使用其所在目录
+        page_path = posixpath.dirname(page_path)
+    feeds = []
+    for tag in LINK_TAG_PATTERN.findall(head):
+        attributes = {m.group(1).lower(): m.group(2) or m.group(3) or m.group(4) or "" for m in ATTRIBUTE_PATTERN.finditer(tag)}
+        if "alternate" not in attributes.get("rel", "").lower().split():
+            continue
+        if attributes.get("type", "").lower() not in FEED_TYPES or not attributes.get("href"):
+            continue
+        feed_url = urljoin(page_url, attributes["href"])
+        if "comments" in feed_url.lower() or "comments" in attributes.get("title", "").lower():
+            continue
+        if feed_url not in feeds:
+            feeds.append(feed_url)
+
+    # 与页面同路径的订阅（如分类页的分类订阅）优先于全站订阅
+    feeds.sort(key=lambda feed: 0 if page_path and urlparse(feed).path.startswith(page_path) else 1)
+    return feeds
+
+
+def _is_fresh(record):
+    return bool(record) and time.time() - record.get("checked_at", 0) < FEED_DISCOVERY_TTL_DAYS * 86400
+
+
+def rejected_feeds(source_name):
+    """返回该源仍在不可用期内的订阅地址"""
+    rejected = source_state.get_value("feed_rejected", source_name) or {}
+    now = time.time()
+    return {feed for feed, rejected_at in rejected.items() if now - rejected_at < FEED_REJECT_TTL_DAYS * 86400}
+
+
+def record_page(source_name, page_url, html):
+    """从源页面中发现订阅地址并缓存，缓存未过期时跳过；不可用期内的订阅地址不记录"""
+    if not FEED_DISCOVERY_ENABLED or _is_fresh(source_state.get_value("feed_discovery", source_name)):
+        return
+    rejected = rejected_feeds(source_name)
+    source_state.set_value("feed_discovery", source_name, {
+        "page_url": page_url,
+        "feeds": [feed for feed in discover_feed_urls(html, page_url) if feed not in rejected],
+        "checked_at": time.time(),
+    })
+
+
+def recording_parser(parser, page_url):
+    """包装解析函数：解析前先从页面中记录订阅地址"""
+    def parse(html, source_name):
+        try:
+            record_page(source_name, page_url, html)
+        except Exception:
+            pass
+        return parser(html, source_name)
+    return parse
+
+
+def get_feed_url(source):
+    """返回该源应使用的订阅地址，没有时返回None
+
+    源配置中的"feed"字段: 订阅地址字符串表示固定使用该地址；False表示禁用自动发现；
+    未配置时使用自动发现的结果。
+    """
+    setting = source.get("feed", "auto")
+    if setting is False or setting is None:
+        return None
+    if isinstance(setting, str) and setting.startswith("http"):
+        return setting
+    if not FEED_DISCOVERY_ENABLED:
+        return None
+    record = source_state.get_value("feed_discovery", source["name"])
+    if not _is_fresh(record):
+        return None
+    rejected = rejected_feeds(source["name"])
+    return next((feed for feed in record.get("feeds", []) if feed not in rejected), None)
+
+
+def reject_feed(source_name, feed_url):
+    """订阅没有返回文章时记为不可用：从发现结果中移除（页面声明的其他订阅仍可使用），
+    FEED_REJECT_TTL_DAYS天内重新发现时也跳过该地址，避免每次运行都重新采用同一个失效的订阅"""
+    now = time.time()
+    rejected = source_state.get_value("feed_rejected", source_name) or {}
+    rejected = {feed: rejected_at for feed, rejected_at in rejected.items()
+                if now - rejected_at < FEED_REJECT_TTL_DAYS * 86400}
+    rejected[feed_url] = now
+    source_state.set_value("feed_rejected", source_name, rejected)
+    record = source_state.get_value("feed_discovery", source_name)
+    if record and feed_url in record.get("feeds", []):
+        record["feeds"].remove(feed_url)
+        source_state.set_value("feed_discovery", source_name, record)
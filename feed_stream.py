@@ -0,0 +1,62 @@
+# 流式RSS/Atom解析
+# 使用ElementTree.iterparse逐条解析订阅内容，调用方取够所需条目后即可停止读取，
+# 无需像feedparser那样先读入整个文档并构建全部条目。
+
+import xml.etree.ElementTree as ET
+
+ParseError = ET.ParseError
+
+ENTRY_TAGS = ("item", "entry")
+DATE_TAGS = ("pubDate", "published", "updated", "date", "issued", "modified")
+# 条目标题只取RSS 2.0(无命名空间)、RSS 1.0和Atom的<title>，media:title等其他命名空间的同名元素不是条目标题
+TITLE_TAGS = {"title", "{http://purl.org/rss/1.0/}title", "{http://www.w3.org/2005/Atom}title"}
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+def _entry_link(element):
+    """RSS使用<link>文本，Atom使用<link rel="alternate" href>；都没有时使用永久链接形式的<guid>
+
+    FeedBurner转发的订阅中<link>是跳转地址，优先使用<feedburner:origLink>给出的原文地址。
+    """
+    for child in element:
+        if _local_name(child.tag) == "origLink" and child.text and child.text.strip():
+            return child.text.strip()
+    guid = None
+    for child in element:
+        name = _local_name(child.tag)
+        if name == "link":
+            href = child.get("href")
+            if href and child.get("rel", "alternate") == "alternate":
+                return href.strip()
+            if child.text and child.text.strip():
+                return child.text.strip()
+        elif name == "guid" and child.get("isPermaLink", "true") != "false" and child.text:
+            guid = child.text.strip()
+    return guid if guid and guid.startswith("http") else ""
+
+
+def iter_feed_entries(stream):
+    """流式解析RSS/Atom，逐条产出 {"title", "link", "published"}；文档不是规范XML时抛出ParseError"""
+    context = ET.iterparse(stream, events=("start", "end"))
+    _, root = next(context)
+    for event, element in context:
+        if event != "end" or _local_name(element.tag) not in ENTRY_TAGS:
+            continue
+
+        title = ""
+        published = ""
+        for child in element:
+            name = _local_name(child.tag)
+            if child.tag in TITLE_TAGS:
+                if not title:
+                    title = "".join(child.itertext()).strip()
+            elif name in DATE_TAGS and not published and child.text:
+                published = child.text.strip()
+
+        yield {"title": title, "link": _entry_link(element), "published": published}
+        # 清理已处理的条目，保持内存平稳
+        element.clear()
+        root.clear()
@@ -0,0 +1,64 @@
+# HTML解析后端
+# 默认使用lxml（C实现，构建DOM树比纯Python的html.parser快数倍），未安装lxml时回退到html.parser；
+# 可在NEWS_SOURCES中用"html_parser"字段为单个源指定后端。
+# 只需要部分元素的解析函数可以传入parse_only（SoupStrainer），其余元素不生成节点，进一步减少建树开销。
+
+from contextlib import contextmanager
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from config import HTML_PARSER, NEWS_SOURCES
+
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+BACKENDS = ("lxml", "html.parser")
+
+_forced_backend = None
+
+
+def source_backend(source_name):
+    """返回NEWS_SOURCES中为该源指定的解析后端，未指定时返回None"""
+    for source in NEWS_SOURCES:
+        if source["name"] == source_name:
+            return source.get("html_parser")
+    return None
+
+
+def resolve_backend(source_name=None):
+    """确定该源使用的解析后端：源的"html_parser"字段优先，其次HTML_PARSER；lxml不可用时使用html.parser"""
+    backend = _forced_backend or source_backend(source_name) or HTML_PARSER
+    if backend == "lxml" and not LXML_AVAILABLE:
+        return "html.parser"
+    return backend
+
+
+@contextmanager
+def forced_backend(backend):
+    """临时让所有源使用指定的解析后端（用于基准测试）"""
+    global _forced_backend
+    previous, _forced_backend = _forced_backend, backend
+    try:
+        yield
+    finally:
+        _forced_backend = previous
+
+
+def make_soup(html, source_name=None, parse_only=None):
+    """用该源的解析后端构建BeautifulSoup；parse_only不为None时只构建匹配的元素及其子节点"""
+    return BeautifulSoup(html, resolve_backend(source_name), parse_only=parse_only)
+
+
+def anchors_with_class(class_names):
+    """只保留class包含class_names之一的<a>元素的SoupStrainer，与find_all("a", class_=[...])匹配的元素一致"""
+    class_names = set(class_names)
+
+    def has_class(value):
+        # 解析过程中得到的是未拆分的class字符串（如"time title"），需要自行拆分
+        classes = value.split() if isinstance(value, str) else value or ()
+        return any(name in class_names for name in classes)
+
+    return SoupStrainer("a", class_=has_class)
@@ -0,0 +1,134 @@
+# HTTP条件请求缓存
+# 按(新闻源, URL)在磁盘上保存ETag/Last-Modified校验值和上次解析出的文章列表；
+# 再次抓取时发送If-None-Match/If-Modified-Since，服务器返回304时跳过解析，直接复用上次的文章列表。
+# 浏览器渲染的页面由脚本加载列表，外壳HTML的校验值不随列表变化，这类源的缓存条目超过max_age后不再使用。
+
+import hashlib
+import json
+import os
+import time
+
+import http_client
+from article import Article
+from config import HTTP_CACHE_ENABLED, HTTP_CACHE_DIR, HTTP_CACHE_RENDERED_MAX_AGE
+
+
+def _entry_path(url, source_name):
+    digest = hashlib.sha1(f"{source_name}\n{url}".encode("utf-8")).hexdigest()
+    return os.path.join(HTTP_CACHE_DIR, f"{digest}.json")
+
+
+def load_entry(url, source_name, max_age=None):
+    """读取缓存条目（文章已恢复为Article），不存在、损坏或保存时间超过max_age秒时返回None"""
+    if not HTTP_CACHE_ENABLED:
+        return None
+    try:
+        with open(_entry_path(url, source_name), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        if max_age is not None and time.time() - entry.get("saved_at", 0) > max_age:
+            return None
+        entry["articles"] = [Article.from_row(row) for row in entry["articles"]]
+        return entry
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_entry(url, source_name, validators, articles):
+    """保存校验值和文章列表；没有任何校验值时无法发起条件请求，不保存
+
+    没有解析出文章时也不保存：否则之后每次304都复用空列表，直到页面本身变化，健康度会把正常的源记为没有产出。
+    """
+    if not HTTP_CACHE_ENABLED or not articles or not any(validators.values()):
+        return
+    entry = {
+        "url": url,
+        "source": source_name,
+        "etag": validators.get("etag"),
+        "last_modified": validators.get("last_modified"),
+        "articles": [article.to_row() for article in articles],
+        "saved_at": time.time(),
+    }
+    path = _entry_path(url, source_name)
+    try:
+        os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def get_validators(response):
+    """从响应头提取校验值"""
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+
+
+def conditional_headers(entry, headers=None):
+    """在请求头中加入条件请求头"""
+    request_headers = dict(headers or {})
+    if entry:
+        if entry.get("etag"):
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+    return request_headers
+
+
+def fetch_and_parse(url, parser, source_name, headers=None, timeout=None, binary=False, stream=False,
+                    cache_name=None, max_age=None, logger=None):
+    """条件请求抓取url并用parser(内容, source_name)解析；304时直接返回缓存的文章列表
+
+    binary为True时把原始字节交给解析函数（如feedparser），否则传入解码后的文本；
+    stream为True时传入可读的响应流，解析函数可以边下载边解析、取够即停，未读完的部分不再下载；
+    cache_name用于同一源的不同抓取方式区分缓存条目，默认使用source_name；
+    max_age（秒）不为None时，超过该时长的缓存条目不再用于条件请求。
+    """
+    cache_name = cache_name or source_name
+    entry = load_entry(url, cache_name, max_age)
+    response = http_client.get(url, headers=conditional_headers(entry, headers), timeout=timeout, stream=stream,
+                               logger=logger)
+    try:
+        if response.status_code == 304 and entry is not None:
+            if logger: logger.info(f"{source_name} 内容未变化(304)，复用缓存的 {len(entry['articles'])} 条文章")
+            return entry["articles"]
+        response.raise_for_status()
+
+        if stream:
+            response.raw.decode_content = True
+            content = response.raw
+        else:
+            content = response.content if binary else response.text
+        articles = parser(content, source_name)
+    finally:
+        response.close()
+    save_entry(url, cache_name, get_validators(response), articles)
+    return articles
+
+
+def revalidate(url, source_name, headers=None, timeout=None, max_age=HTTP_CACHE_RENDERED_MAX_AGE, logger=None):
+    """为需要浏览器渲染的页面发送条件请求
+
+    返回(缓存文章, 校验值)：页面未变化且缓存未超过max_age秒时缓存文章为列表，调用方可跳过渲染；
+    否则为None，渲染解析后应调用save_entry保存返回的校验值。
+    """
+    if not HTTP_CACHE_ENABLED:
+        return None, {}
+    entry = load_entry(url, source_name, max_age)
+    try:
+        # 只是探测页面是否变化，失败时直接渲染即可，不重试
+        response = http_client.get(url, headers=conditional_headers(entry, headers), timeout=timeout, stream=True,
+                                   retries=0)
+        response.close()
+    except Exception as e:
+        if logger: logger.debug(f"{source_name} 条件请求失败，直接渲染: {e}")
+        return None, {}
+    if response.status_code == 304 and entry is not None:
+        if logger: logger.info(f"{source_name} 页面未变化(304)，跳过渲染，复用缓存的 {len(entry['articles'])} 条文章")
+        return entry["articles"], {}
+    if response.status_code >= 400:
+        return None, {}
+    return None, get_validators(response)
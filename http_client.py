@@ -0,0 +1,145 @@
+# 进程级HTTP会话注册表
+# 按主机复用requests.Session及其连接池(keep-alive)，新闻源抓取、飞书接口和令牌请求共用，
+# 所有请求都带默认超时和退避重试，并可查看连接复用统计以评估节省的TCP/TLS握手次数。
+
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import retry_policy
+from config import (REQUEST_TIMEOUT, HTTP_CONNECT_TIMEOUT, HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE,
+                    HTTP_HEDGE_ENABLED)
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_sessions = {}
+_request_counts = {}
+_lock = threading.Lock()
+
+
+def _host_key(url):
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc.lower()}"
+
+
+def get_session(url):
+    """获取url所在主机的共享会话，不存在时创建"""
+    key = _host_key(url)
+    session = _sessions.get(key)
+    if session is not None:
+        return session
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[key] = session
+            _request_counts[key] = 0
+    return session
+
+
+def request(method, url, timeout=None, retries=None, logger=None, **kwargs):
+    """通过共享会话发送请求，未指定超时时使用默认的(连接超时, 读取超时)，并且不超过当前截止时间的剩余时间
+
+    连接失败、超时和可重试的状态码(429/5xx等)按retry_policy退避重试，retries=0关闭重试；
+    非幂等请求(POST)只在服务器确定未处理时重试，避免重复发送消息。
+    重试用尽后返回最后一次的响应或抛出最后一次的异常，调用方的处理方式不变。
+    """
+    if timeout is None:
+        timeout = (HTTP_CONNECT_TIMEOUT, REQUEST_TIMEOUT)
+        # 在新闻源的截止时间内抓取时，请求超时不超过剩余时间
+        remaining = retry_policy.remaining_time()
+        if remaining is not None:
+            remaining = max(remaining, 0.5)
+            timeout = (min(HTTP_CONNECT_TIMEOUT, remaining), min(REQUEST_TIMEOUT, remaining))
+    session = get_session(url)
+    key = _host_key(url)
+    idempotent = method.upper() in IDEMPOTENT_METHODS
+
+    def send():
+        with _lock:
+            _request_counts[key] = _request_counts.get(key, 0) + 1
+        started = time.monotonic()
+        response = session.request(method, url, timeout=timeout, **kwargs)
+        if response.status_code < 400:
+            retry_policy.record_latency(key, time.monotonic() - started)
+        return response
+
+    def send_hedged():
+        # 只有幂等请求可以对冲；带文件等请求体的请求不能重复发送
+        if not (HTTP_HEDGE_ENABLED and idempotent):
+            return send()
+        return retry_policy.hedged_call(send, retry_policy.hedge_delay(key))
+
+    return retry_policy.call_with_retry(
+        send_hedged, description=f"{method.upper()} {url}", retries=retries, idempotent=idempotent,
+        should_retry=lambda response: retry_policy.is_retryable_status(response.status_code, idempotent),
+        logger=logger)
+
+
+def get(url, **kwargs):
+    """共享会话版的requests.get"""
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    """共享会话版的requests.post"""
+    return request("POST", url, **kwargs)
+
+
+def get_connection_stats():
+    """返回各主机的连接复用统计: {主机: {"requests": 请求数, "connections": 新建连接数, "reused": 复用次数}}"""
+    stats = {}
+    with _lock:
+        items = list(_sessions.items())
+        counts = dict(_request_counts)
+    for key, session in items:
+        connections = 0
+        for adapter in session.adapters.values():
+            pools = adapter.poolmanager.pools
+            for pool_key in list(pools.keys()):
+                pool = pools.get(pool_key)
+                if pool is not None:
+                    connections += pool.num_connections
+        requests_sent = counts.get(key, 0)
+        stats[key] = {
+            "requests": requests_sent,
+            "connections": connections,
+            "reused": max(requests_sent - connections, 0),
+        }
+    return stats
+
+
+def log_connection_stats(logger=None):
+    """输出连接复用统计"""
+    stats = get_connection_stats()
+    total_requests = sum(item["requests"] for item in stats.values())
+    total_reused = sum(item["reused"] for item in stats.values())
+    lines = [f"HTTP连接复用统计: {total_requests} 次请求, 复用连接 {total_reused} 次(节省的握手次数)"]
+    for key, item in sorted(stats.items()):
+        lines.append(f"   {key}: 请求 {item['requests']}, 新建连接 {item['connections']}, 复用 {item['reused']}")
+    for line in lines:
+        if logger:
+            logger.info(line)
+        else:
+            print(line)
+    return stats
+
+
+def close_all_sessions():
+    """关闭所有共享会话及其连接池"""
+    retry_policy.shutdown()
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+        _request_counts.clear()
+    for session in sessions:
+        try:
+            session.close()
+        except Exception:
+            pass
@@ -0,0 +1,111 @@
+# 关键词匹配
+# 用全部关键词构建一次Aho-Corasick自动机，每个标题只扫描一遍即可找出所有命中的关键词，
+# 耗时与标题长度成正比，与关键词数量无关，关键词扩充到上千个也不会变慢。
+# "ai"、"gpt"这类很短的英文关键词要求按完整单词出现，避免"said"、"email"之类的误匹配，
+# 但允许后接数字或复数s（"gpt4"、"LLMs"）；中文关键词和较长的英文关键词仍按子串匹配。
+
+from collections import deque
+
+from config import AI_KEYWORDS, KEYWORD_BOUNDARY_MAX_LENGTH
+
+
+def _is_word_char(char):
+    return char.isascii() and char.isalnum()
+
+
+def _is_letter(char):
+    return char.isascii() and char.isalpha()
+
+
+class KeywordMatcher:
+    """基于Aho-Corasick自动机的多关键词匹配器（不区分大小写），构建后只读，可在多线程中共享"""
+
+    def __init__(self, keywords, boundary_max_length=KEYWORD_BOUNDARY_MAX_LENGTH):
+        self.keywords = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        # 需要检查词边界的关键词
+        self._bounded = set()
+        seen = set()
+        for keyword in keywords:
+            keyword = keyword.strip().lower()
+            if not keyword or keyword in seen:
+                continue
+            seen.add(keyword)
+            self.keywords.append(keyword)
+            if len(keyword) <= boundary_max_length and all(_is_word_char(char) for char in keyword):
+                self._bounded.add(keyword)
+            self._add(keyword)
+        self._build_fail_links()
+
+    def _add(self, keyword):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] = self._output[state] + (keyword,)
+
+    def _build_fail_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                # 后缀上能匹配的关键词也在此状态输出
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def _at_boundary(self, text, start, end):
+        """text[start:end]前面不是字母数字，后面不是字母（复数s除外）"""
+        if start > 0 and _is_word_char(text[start - 1]):
+            return False
+        if end < len(text) and text[end] == "s":
+            end += 1
+        return end == len(text) or not _is_letter(text[end])
+
+    def iter_matches(self, text):
+        """按出现位置依次产出命中的关键词（可能重复）"""
+        if not text:
+            return
+        text = text.lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword in output[state]:
+                if keyword in self._bounded and not self._at_boundary(text, end - len(keyword), end):
+                    continue
+                yield keyword
+
+    def find(self, text):
+        """返回命中的关键词列表（按首次出现的顺序去重）"""
+        return list(dict.fromkeys(self.iter_matches(text)))
+
+    def matches(self, text):
+        """是否命中任意关键词，命中第一个即返回"""
+        return next(self.iter_matches(text), None) is not None
+
+
+AI_MATCHER = KeywordMatcher(AI_KEYWORDS)
+
+
+def is_ai_related(text):
+    """文本是否包含AI_KEYWORDS中的关键词"""
+    return AI_MATCHER.matches(text)
+
+
+def matched_keywords(text):
+    """返回文本命中的AI关键词"""
+    return AI_MATCHER.find(text)
@@ -1,23 +1,61 @@
+import concurrent.futures
+import functools
+import heapq
+import itertools
 import json
 import logging
 import os
 import re
 import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import closing
 from datetime import datetime
+from urllib.parse import urlparse
 
 import feedparser
-import requests
-from bs4 import BeautifulSoup
-from openai import OpenAI
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
+from openai import OpenAI, APIConnectionError, InternalServerError, RateLimitError
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
-from config import (NEWS_SOURCES, MAX_ARTICLES_PER_SOURCE, MAX_TOTAL_ARTICLES, MAX_ARTICLES_PER_PRIORITY,
-                    AI_KEYWORDS, REQUEST_TIMEOUT, LOG_CONFIG, MODEL_PROVIDERS, CURRENT_PROVIDER)
+from config import (NEWS_SOURCES, MAX_ARTICLES_PER_SOURCE,
+                    LOG_CONFIG, MODEL_PROVIDERS, CURRENT_PROVIDER,
+                    FETCH_MAX_WORKERS, FETCH_MAX_PER_HOST, SOURCE_FETCH_TIMEOUT, FETCH_GLOBAL_TIMEOUT,
+                    GENERIC_STATIC_MIN_ARTICLES,
+                    FETCH_TIER_RECHECK_DAYS, SITEMAP_MAX_CHILDREN, HTTP_CACHE_RENDERED_MAX_AGE)
+import embedded_state
+import feed_discovery
+import feed_stream
+import http_cache
+import http_client
+import retry_policy
+import sent_history
+import sitemap_reader
+import source_health
+import source_state
+from article import Article
+from article_selection import PriorityQuota, build_pipeline
+from url_utils import resolve_link
+from date_parsing import parse_datetime
+from dom_candidates import DomIndex, cascade, class_matches, has_class
+from browser_pool import get_browser_pool, render_page, shutdown_browser_pool
+from html_backend import anchors_with_class, make_soup
+from keyword_matcher import KeywordMatcher, is_ai_related
+
+# 静态页面请求头
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+KR36_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1"
+}
+API_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Accept": "application/json"
+}
 
 # PySpark支持
 try:
@@ -54,17 +92,20 @@ def get_model_client(provider_name=None, logger=None):
         if provider_name == "deepseek":
             client = OpenAI(
                 api_key=provider_config["api_key"],
-                base_url=provider_config["base_url"]
+                base_url=provider_config["base_url"],
+                max_retries=0  # 由retry_policy统一重试
             )
         elif provider_name == "kimi":
             client = OpenAI(
                 api_key=provider_config["api_key"],
-                base_url=provider_config["base_url"]
+                base_url=provider_config["base_url"],
+                max_retries=0  # 由retry_policy统一重试
             )
         elif provider_name == "glm":
             client = OpenAI(
                 api_key=provider_config["api_key"],
-                base_url=provider_config["base_url"]
+                base_url=provider_config["base_url"],
+                max_retries=0  # 由retry_policy统一重试
             )
         else:
             if logger:
@@ -124,7 +165,7 @@ def get_tenant_access_token(app_id, app_secret, logger):
         "app_secret": app_secret
     }
     try:
-        response = requests.post(url, headers=headers, data=json.dumps(data))
+        response = http_client.post(url, headers=headers, data=json.dumps(data), logger=logger)
         response.raise_for_status()
         result = response.json()
         if result.get("code") == 0:
@@ -161,6 +202,8 @@ def get_ai_news_from_source(url, source_name="机器之心", logger=None):
             return get_techcrunch_news(url, source_name, logger)
         elif source_name.endswith("RSS") or "rss" in source_name.lower():
             return get_rss_news(url, source_name, logger)
+        elif is_sitemap_source(source_name):
+            return get_sitemap_news(url, source_name, logger)
         elif source_name.endswith("API") or "api" in source_name.lower():
             return get_api_news(url, source_name, logger)
         else:
@@ -170,658 +213,809 @@ def get_ai_news_from_source(url, source_name="机器之心", logger=None):
             logger.error(f"从 {source_name} 获取新闻时出错 {url}: {e}")
         return []
 
+def lazy_parser(generator_function):
+    """把逐条产出文章的生成器包装为解析函数parser(content, source_name)
+
+    只取前MAX_ARTICLES_PER_SOURCE条，取够后生成器不再继续，剩余元素的标题、关键词和日期都不再解析。
+    其余关键字参数（如页面地址page_url）原样传给生成器。
+    """
+    @functools.wraps(generator_function)
+    def parse(content, source_name, limit=MAX_ARTICLES_PER_SOURCE, **options):
+        return list(itertools.islice(generator_function(content, source_name, **options), limit))
+    return parse
+
+def build_jiqizhixin_link(item):
+    """根据机器之心内嵌状态中的slug/id构造文章链接"""
+    slug = item.get("slug") or item.get("id")
+    return f"https://www.jiqizhixin.com/articles/{slug}" if slug else ""
+
+@lazy_parser
+def parse_jiqizhixin_state(html, source_name):
+    """从机器之心页面的内嵌JSON状态中解析新闻"""
+    yield from embedded_state.iter_articles(html, source_name, "https://www.jiqizhixin.com", build_jiqizhixin_link)
+
+# 机器之心DOM启发式匹配使用的预编译正则
+JIQIZHIXIN_BASE_URL = "https://www.jiqizhixin.com"
+JIQIZHIXIN_ITEM_CLASSES = {"article-item", "news-item", "post-title", "title"}
+JIQIZHIXIN_HREF_PATTERN = re.compile(r"articles|news|post|reference")
+ONCLICK_URL_PATTERN = re.compile(r"'(https?://[^']+)'")
+ONCLICK_ARTICLE_PATTERN = re.compile(r"'(/articles/[^']+)'")
+JIQIZHIXIN_LINK_MATCHER = KeywordMatcher(["ai", "机器", "智能"])
+
+@lazy_parser
+def parse_jiqizhixin_dom(html, source_name):
+    """从渲染后的机器之心页面中用DOM启发式匹配解析新闻"""
+    soup = make_soup(html, source_name)
+    # 只遍历一次DOM树，各层回退匹配和日期查找都基于同一份索引
+    index = DomIndex(soup)
+    anchors = index.anchors
+    
+    def is_ai_link(link):
+        text = index.text(link)
+        return len(text) > 10 and JIQIZHIXIN_LINK_MATCHER.matches(text)
+    
+    news_items = cascade([
+        (a for a in anchors if has_class(a, ("body-title",))),
+        (a for a in anchors if has_class(a, JIQIZHIXIN_ITEM_CLASSES)),
+        (a for a in anchors if JIQIZHIXIN_HREF_PATTERN.search(a.get("href") or "")),
+        (a for a in anchors if a.has_attr("href") and is_ai_link(a)),
+    ])
+    
+    for item in news_items:
+        title = index.text(item)
+        if len(title) < 5:
+            continue
+            
+        # 依次尝试href、onclick中的地址和data-href
+        link = resolve_link(JIQIZHIXIN_BASE_URL, item.get("href"))
+        if not link:
+            onclick = item.get("onclick", "")
+            match = ONCLICK_URL_PATTERN.search(onclick) or ONCLICK_ARTICLE_PATTERN.search(onclick)
+            if match:
+                link = resolve_link(JIQIZHIXIN_BASE_URL, match.group(1))
+        if not link:
+            link = resolve_link(JIQIZHIXIN_BASE_URL, item.get("data-href"))
+        
+        if not link:
+            continue
+        
+        parent = item.find_parent()
+        published = parse_datetime(parent and index.first_date(parent))
+        
+        yield Article(title, link, source_name, published=published)
+
 def get_jiqizhixin_news(url, source_name, logger=None):
-    """获取机器之心新闻"""
+    """获取机器之心新闻：优先解析静态页面中的内嵌状态，没有时再渲染页面"""
     try:
-        if logger: logger.debug(f"初始化Chrome浏览器配置...")
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-dev-tools-bridge")
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_argument("--disable-plugins")
-        chrome_options.add_argument("--disable-images")
-        chrome_options.add_argument("--disable-javascript-har-promises")
-        chrome_options.add_argument("--disable-web-security")
-        chrome_options.add_argument("--no-first-run")
-        chrome_options.add_argument("--disable-default-apps")
-        chrome_options.add_argument("--disable-background-timer-throttling")
-        chrome_options.add_argument("--disable-renderer-backgrounding")
-        chrome_options.add_argument("--disable-features=TranslateUI")
-        chrome_options.add_argument("--disable-ipc-flooding-protection")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-        
-        # 设置二进制路径和驱动
-        chrome_options.binary_location = "/usr/bin/google-chrome-stable"
-        service = Service(executable_path="/usr/bin/chromedriver")
-        
-        if logger: logger.debug(f"启动Chrome浏览器...")
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        if logger: logger.debug(f"正在访问页面: {url}")
-        driver.get(url)
-        
-        if logger: logger.debug(f"等待页面加载...")
-        wait = WebDriverWait(driver, 30)
-        try:
-            wait.until(EC.presence_of_element_located((By.CLASS_NAME, "home__left-body")))
-        except:
-            if logger: logger.warning(f"未找到home__left-body元素，尝试其他选择器")
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "body")))
-        
-        if logger: logger.debug(f"获取页面源码...")
-        page_source = driver.page_source
+        if get_fetch_tier(source_name) != "browser":
+            try:
+                articles = http_cache.fetch_and_parse(url, feed_discovery.recording_parser(parse_jiqizhixin_state, url),
+                                                      source_name, headers=DEFAULT_HEADERS,
+                                                      cache_name=f"{source_name}#static",
+                                                      max_age=HTTP_CACHE_RENDERED_MAX_AGE, logger=logger)
+            except Exception as e:
+                if logger: logger.warning(f"{source_name} 静态抓取失败: {e}")
+                articles = []
+            if articles:
+                remember_fetch_tier(source_name, "static")
+                return articles
+            if logger: logger.info(f"{source_name} 页面中未找到内嵌文章数据，使用浏览器渲染")
+        
+        # 页面未变化时直接复用上次的解析结果，无需渲染
+        cached_articles, validators = http_cache.revalidate(url, source_name, headers=DEFAULT_HEADERS, logger=logger)
+        if cached_articles is not None:
+            return cached_articles
+        
+        # 渲染页面：home__left-body出现或链接数量足够即开始解析
+        page_source = render_page(url, ready_selector=(By.CLASS_NAME, "home__left-body"), logger=logger)
         if logger: logger.debug(f"页面源码长度: {len(page_source)} 字符")
         
-        if logger: logger.debug(f"关闭浏览器...")
-        driver.quit()
-        
-        soup = BeautifulSoup(page_source, "html.parser")
-        articles = []
-        
-        news_items = soup.find_all("a", class_="body-title")
-        
-        if len(news_items) < 5:
-            more_items = soup.find_all("a", class_=["article-item", "news-item", "post-title", "title"])
-            news_items.extend(more_items)
-        
-        if len(news_items) < 5:
-            potential_titles = soup.find_all(["h1", "h2", "h3", "h4"], class_=re.compile(r"title|heading|headline"))
-            more_items = soup.find_all("a", href=re.compile(r"articles|news|post|reference"))
-            news_items.extend(more_items)
-        
-        if len(news_items) < 5:
-            all_links = soup.find_all("a", href=True)
-            ai_links = []
-            for link in all_links:
-                text = link.get_text(strip=True)
-                if len(text) > 10 and ("ai" in text.lower() or "机器" in text or "智能" in text or "AI" in text):
-                    ai_links.append(link)
-            news_items.extend(ai_links)
-        
-        for item in news_items:
-            title = item.get_text(strip=True)
-            if len(title) < 5:
-                continue
-                
-            link = item.get("href", "")
-            if link:
-                if not link.startswith("http"):
-                    if link.startswith("/"):
-                        link = "https://www.jiqizhixin.com" + link
-                    else:
-                        link = "https://www.jiqizhixin.com/" + link
-            else:
-                onclick = item.get("onclick", "")
-                if onclick:
-                    match = re.search(r"'(https?://[^']+)'", onclick)
-                    if match:
-                        link = match.group(1)
-                    else:
-                        match = re.search(r"'(/articles/[^']+)'", onclick)
-                        if match:
-                            link = "https://www.jiqizhixin.com" + match.group(1)
-                if not link:
-                    data_href = item.get("data-href", "")
-                    if data_href:
-                        if not data_href.startswith("http"):
-                            if data_href.startswith("/"):
-                                link = "https://www.jiqizhixin.com" + data_href
-                            else:
-                                link = "https://www.jiqizhixin.com/" + data_href
-                        else:
-                            link = data_href
-            
-            if not link:
-                continue
-            
-            date = datetime.now().strftime("%m月%d日")
-            parent = item.find_parent()
-            if parent:
-                date_elements = parent.find_all(string=re.compile(r"\d{1,2}月\d{1,2}日"))
-                if date_elements:
-                    date_match = re.search(r"\d{1,2}月\d{1,2}日", str(date_elements[0]))
-                    if date_match:
-                        date = date_match.group(0)
-            
-            articles.append({"title": title, "link": link, "date": date, "source": source_name})
+        articles = parse_jiqizhixin_dom(page_source, source_name)
         
+        http_cache.save_entry(url, source_name, validators, articles)
+        if articles:
+            remember_fetch_tier(source_name, "browser")
         return articles
     except Exception as e:
         if logger: logger.error(f"获取机器之心新闻时出错: {e}")
+        source_health.report_error(source_name, e)
         return []
 
-def get_36kr_news(url, source_name, logger=None):
-    """获取36氪AI新闻"""
-    try:
-        # 先尝试使用requests获取
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Connection": "keep-alive",
-            "Upgrade-Insecure-Requests": "1"
-        }
+def build_36kr_link(item):
+    """根据36氪内嵌状态中的itemId构造文章链接"""
+    item_id = item.get("itemId") or item.get("id")
+    return f"https://36kr.com/p/{item_id}" if item_id else ""
+
+# 36氪DOM启发式匹配使用的类名和预编译正则
+KR36_TITLE_CLASSES = {"item-title", "article-title", "title", "post-title"}
+KR36_CONTAINER_CLASS_PATTERN = re.compile(r"item|article|post")
+
+@lazy_parser
+def parse_36kr_html(html, source_name):
+    """解析36氪页面中的AI新闻"""
+    # 优先解析内嵌的window.initialState，没有内嵌文章数据时再使用DOM启发式匹配
+    embedded_articles = embedded_state.iter_articles(html, source_name, "https://36kr.com", build_36kr_link)
+    first_article = next(embedded_articles, None)
+    if first_article is not None:
+        for article in itertools.chain([first_article], embedded_articles):
+            if is_ai_related(article.title):
+                yield article
+        return
+    
+    soup = make_soup(html, source_name)
+    index = DomIndex(soup)
+    anchors = index.anchors
+    
+    def is_ai_link(link):
+        text = index.text(link)
+        return len(text) > 10 and is_ai_related(text)
+    
+    # 依次尝试: 文章标题链接、包含AI关键词的链接、特定的文章容器
+    news_items = cascade([
+        (a for a in anchors if has_class(a, KR36_TITLE_CLASSES)),
+        (a for a in anchors if a.has_attr("href") and is_ai_link(a)),
+        (div for div in index.containers if class_matches(div, KR36_CONTAINER_CLASS_PATTERN)),
+    ])
+    
+    for item in news_items:
+        # 如果是div容器，需要从中提取链接
+        if item.name == "div":
+            link_element = index.first_anchor(item)
+            if not link_element:
+                continue
+            title = index.text(link_element)
+            link = link_element.get("href", "")
+        else:
+            title = index.text(item)
+            link = item.get("href", "")
         
-        response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
+        if len(title) < 5:
+            continue
+            
+        link = resolve_link("https://36kr.com", link)
         
-        soup = BeautifulSoup(response.text, "html.parser")
-        articles = []
+        if not link:
+            continue
         
-        # 尝试多种可能的类名和选择器
-        news_items = []
+        # 筛选AI相关新闻
+        if not is_ai_related(title):
+            continue
         
-        # 方法1：寻找文章链接
-        news_items.extend(soup.find_all("a", class_=["item-title", "article-title", "title", "post-title"]))
-        
-        # 方法2：寻找包含AI关键词的链接
-        if len(news_items) < 5:
-            all_links = soup.find_all("a", href=True)
-            for link in all_links:
-                text = link.get_text(strip=True)
-                if len(text) > 10 and any(keyword in text.lower() for keyword in AI_KEYWORDS):
-                    news_items.append(link)
-        
-        # 方法3：寻找特定的文章容器
-        if len(news_items) < 5:
-            news_items.extend(soup.find_all("div", class_=re.compile(r"item|article|post")))
-        
-        for item in news_items:
-            # 如果是div容器，需要从中提取链接
-            if item.name == "div":
-                link_element = item.find("a")
-                if not link_element:
-                    continue
-                title = link_element.get_text(strip=True)
-                link = link_element.get("href", "")
-            else:
-                title = item.get_text(strip=True)
-                link = item.get("href", "")
-            
-            if len(title) < 5:
-                continue
-                
-            if link:
-                if not link.startswith("http"):
-                    if link.startswith("/"):
-                        link = "https://36kr.com" + link
-                    else:
-                        link = "https://36kr.com/" + link
-            
-            if not link:
-                continue
-            
-            # 筛选AI相关新闻
-            if not any(keyword in title.lower() for keyword in AI_KEYWORDS):
-                continue
-            
-            date = datetime.now().strftime("%m月%d日")
-            
-            # 尝试从父元素获取日期
-            parent = item.find_parent()
-            if parent:
-                time_element = parent.find("time") or parent.find("span", class_=re.compile(r"time|date"))
-                if time_element:
-                    date_text = time_element.get_text(strip=True)
-                    date_match = re.search(r"\d{1,2}月\d{1,2}日", date_text)
-                    if date_match:
-                        date = date_match.group(0)
-            
-            articles.append({"title": title, "link": link, "date": date, "source": source_name})
+        # 尝试从父元素的时间元素获取发布时间（优先使用datetime属性）
+        published = None
+        parent = item.find_parent()
+        if parent:
+            time_element = index.first_time_element(parent)
+            if time_element:
+                published = parse_datetime(time_element.get("datetime") or time_element.get_text(strip=True))
         
-        return articles
+        yield Article(title, link, source_name, published=published)
+
+def get_36kr_news(url, source_name, logger=None):
+    """获取36氪AI新闻"""
+    try:
+        return http_cache.fetch_and_parse(url, parse_36kr_html, source_name, headers=KR36_HEADERS, logger=logger)
     except Exception as e:
         if logger: logger.error(f"获取36氪新闻时出错: {e}")
+        source_health.report_error(source_name, e)
         return []
 
-def get_infoq_news(url, source_name, logger=None):
-    """获取InfoQ AI新闻"""
-    try:
-        response = requests.get(url, headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"})
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, "html.parser")
-        articles = []
+@lazy_parser
+def parse_infoq_html(html, source_name):
+    """解析InfoQ页面中的AI新闻"""
+    title_classes = ["news-title", "article-title", "title"]
+    # 只需要标题链接，其余元素不构建
+    soup = make_soup(html, source_name, parse_only=anchors_with_class(title_classes))
+    
+    news_items = soup.find_all("a", class_=title_classes)
+    
+    for item in news_items:
+        title = item.get_text(strip=True)
+        if len(title) < 5:
+            continue
+            
+        link = item.get("href", "")
+        link = resolve_link("https://www.infoq.cn", link)
         
-        news_items = soup.find_all("a", class_=["news-title", "article-title", "title"])
+        if not link:
+            continue
         
-        for item in news_items:
-            title = item.get_text(strip=True)
-            if len(title) < 5:
-                continue
-                
-            link = item.get("href", "")
-            if link:
-                if not link.startswith("http"):
-                    if link.startswith("/"):
-                        link = "https://www.infoq.cn" + link
-                    else:
-                        link = "https://www.infoq.cn/" + link
-            
-            if not link:
-                continue
-            
-            # 筛选AI相关新闻
-            if not any(keyword in title.lower() for keyword in AI_KEYWORDS):
-                continue
-            
-            date = datetime.now().strftime("%m月%d日")
-            
-            articles.append({"title": title, "link": link, "date": date, "source": source_name})
+        # 筛选AI相关新闻
+        if not is_ai_related(title):
+            continue
         
-        return articles
+        yield Article(title, link, source_name)
+
+def get_infoq_news(url, source_name, logger=None):
+    """获取InfoQ AI新闻"""
+    try:
+        return http_cache.fetch_and_parse(url, parse_infoq_html, source_name, headers=DEFAULT_HEADERS, logger=logger)
     except Exception as e:
         if logger: logger.error(f"获取InfoQ新闻时出错: {e}")
+        source_health.report_error(source_name, e)
         return []
 
-def get_aminer_news(url, source_name, logger=None):
-    """获取AMiner AI新闻"""
-    try:
-        response = requests.get(url, headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"})
-        response.raise_for_status()
+@lazy_parser
+def parse_aminer_html(html, source_name):
+    """解析AMiner页面中的AI新闻"""
+    title_classes = ["title", "paper-title", "article-title"]
+    # 只需要标题链接，其余元素不构建
+    soup = make_soup(html, source_name, parse_only=anchors_with_class(title_classes))
+    
+    news_items = soup.find_all("a", class_=title_classes)
+    
+    for item in news_items:
+        title = item.get_text(strip=True)
+        if len(title) < 5:
+            continue
+            
+        link = item.get("href", "")
+        link = resolve_link("https://www.aminer.cn", link)
         
-        soup = BeautifulSoup(response.text, "html.parser")
-        articles = []
+        if not link:
+            continue
         
-        news_items = soup.find_all("a", class_=["title", "paper-title", "article-title"])
+        # 筛选AI相关新闻
+        if not is_ai_related(title):
+            continue
         
-        for item in news_items:
-            title = item.get_text(strip=True)
-            if len(title) < 5:
-                continue
-                
-            link = item.get("href", "")
-            if link:
-                if not link.startswith("http"):
-                    if link.startswith("/"):
-                        link = "https://www.aminer.cn" + link
-                    else:
-                        link = "https://www.aminer.cn/" + link
-            
-            if not link:
-                continue
-            
-            # 筛选AI相关新闻
-            if not any(keyword in title.lower() for keyword in AI_KEYWORDS):
-                continue
-            
-            date = datetime.now().strftime("%m月%d日")
-            
-            articles.append({"title": title, "link": link, "date": date, "source": source_name})
-        
-        return articles
+        yield Article(title, link, source_name)
+
+def get_aminer_news(url, source_name, logger=None):
+    """获取AMiner AI新闻"""
+    try:
+        return http_cache.fetch_and_parse(url, parse_aminer_html, source_name, headers=DEFAULT_HEADERS, logger=logger)
     except Exception as e:
         if logger: logger.error(f"获取AMiner新闻时出错: {e}")
+        source_health.report_error(source_name, e)
         return []
 
-def get_leiphone_news(url, source_name, logger=None):
-    """获取雷锋网AI新闻"""
-    try:
-        response = requests.get(url, headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"})
-        response.raise_for_status()
+@lazy_parser
+def parse_leiphone_html(html, source_name):
+    """解析雷锋网页面中的AI新闻"""
+    title_classes = ["title", "article-title", "post-title"]
+    # 只需要标题链接，其余元素不构建
+    soup = make_soup(html, source_name, parse_only=anchors_with_class(title_classes))
+    
+    news_items = soup.find_all("a", class_=title_classes)
+    
+    for item in news_items:
+        title = item.get_text(strip=True)
+        if len(title) < 5:
+            continue
+            
+        link = item.get("href", "")
+        link = resolve_link("https://www.leiphone.com", link)
         
-        soup = BeautifulSoup(response.text, "html.parser")
-        articles = []
+        if not link:
+            continue
         
-        news_items = soup.find_all("a", class_=["title", "article-title", "post-title"])
+        # 筛选AI相关新闻
+        if not is_ai_related(title):
+            continue
         
-        for item in news_items:
-            title = item.get_text(strip=True)
-            if len(title) < 5:
-                continue
-                
-            link = item.get("href", "")
-            if link:
-                if not link.startswith("http"):
-                    if link.startswith("/"):
-                        link = "https://www.leiphone.com" + link
-                    else:
-                        link = "https://www.leiphone.com/" + link
-            
-            if not link:
-                continue
-            
-            # 筛选AI相关新闻
-            if not any(keyword in title.lower() for keyword in AI_KEYWORDS):
-                continue
-            
-            date = datetime.now().strftime("%m月%d日")
-            
-            articles.append({"title": title, "link": link, "date": date, "source": source_name})
-        
-        return articles
+        yield Article(title, link, source_name)
+
+def get_leiphone_news(url, source_name, logger=None):
+    """获取雷锋网AI新闻"""
+    try:
+        return http_cache.fetch_and_parse(url, parse_leiphone_html, source_name, headers=DEFAULT_HEADERS, logger=logger)
     except Exception as e:
         if logger: logger.error(f"获取雷锋网新闻时出错: {e}")
+        source_health.report_error(source_name, e)
         return []
 
-def get_venturebeat_news(url, source_name, logger=None):
-    """获取VentureBeat AI新闻"""
-    try:
-        response = requests.get(url, headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"})
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, "html.parser")
-        articles = []
+@lazy_parser
+def parse_venturebeat_html(html, source_name):
+    """解析VentureBeat页面中的AI新闻"""
+    title_classes = ["title", "article-title", "entry-title"]
+    # 只需要标题链接，其余元素不构建
+    soup = make_soup(html, source_name, parse_only=anchors_with_class(title_classes))
+    
+    news_items = soup.find_all("a", class_=title_classes)
+    
+    for item in news_items:
+        title = item.get_text(strip=True)
+        if len(title) < 5:
+            continue
+            
+        link = item.get("href", "")
+        link = resolve_link("https://venturebeat.com", link)
         
-        news_items = soup.find_all("a", class_=["title", "article-title", "entry-title"])
+        if not link:
+            continue
         
-        for item in news_items:
-            title = item.get_text(strip=True)
-            if len(title) < 5:
-                continue
-                
-            link = item.get("href", "")
-            if link and not link.startswith("http"):
-                if link.startswith("/"):
-                    link = "https://venturebeat.com" + link
-                else:
-                    link = "https://venturebeat.com/" + link
-            
-            if not link:
-                continue
-            
-            # 筛选AI相关新闻
-            if not any(keyword in title.lower() for keyword in AI_KEYWORDS):
-                continue
-            
-            date = datetime.now().strftime("%m月%d日")
-            
-            articles.append({"title": title, "link": link, "date": date, "source": source_name})
+        # 筛选AI相关新闻
+        if not is_ai_related(title):
+            continue
         
-        return articles
+        yield Article(title, link, source_name)
+
+def get_venturebeat_news(url, source_name, logger=None):
+    """获取VentureBeat AI新闻"""
+    try:
+        return http_cache.fetch_and_parse(url, parse_venturebeat_html, source_name, headers=DEFAULT_HEADERS, logger=logger)
     except Exception as e:
         if logger: logger.error(f"获取VentureBeat新闻时出错: {e}")
+        source_health.report_error(source_name, e)
         return []
 
-def get_techcrunch_news(url, source_name, logger=None):
-    """获取TechCrunch AI新闻"""
-    try:
-        response = requests.get(url, headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"})
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, "html.parser")
-        articles = []
+@lazy_parser
+def parse_techcrunch_html(html, source_name):
+    """解析TechCrunch页面中的AI新闻"""
+    title_classes = ["title", "article-title", "entry-title", "post-title"]
+    # 只需要标题链接，其余元素不构建
+    soup = make_soup(html, source_name, parse_only=anchors_with_class(title_classes))
+    
+    news_items = soup.find_all("a", class_=title_classes)
+    
+    for item in news_items:
+        title = item.get_text(strip=True)
+        if len(title) < 5:
+            continue
+            
+        link = item.get("href", "")
+        link = resolve_link("https://techcrunch.com", link)
         
-        news_items = soup.find_all("a", class_=["title", "article-title", "entry-title", "post-title"])
+        if not link:
+            continue
         
-        for item in news_items:
-            title = item.get_text(strip=True)
-            if len(title) < 5:
-                continue
-                
-            link = item.get("href", "")
-            if link and not link.startswith("http"):
-                if link.startswith("/"):
-                    link = "https://techcrunch.com" + link
-                else:
-                    link = "https://techcrunch.com/" + link
-            
-            if not link:
-                continue
-            
-            # 筛选AI相关新闻
-            if not any(keyword in title.lower() for keyword in AI_KEYWORDS):
-                continue
-            
-            date = datetime.now().strftime("%m月%d日")
-            
-            articles.append({"title": title, "link": link, "date": date, "source": source_name})
+        # 筛选AI相关新闻
+        if not is_ai_related(title):
+            continue
         
-        return articles
+        yield Article(title, link, source_name)
+
+def get_techcrunch_news(url, source_name, logger=None):
+    """获取TechCrunch AI新闻"""
+    try:
+        return http_cache.fetch_and_parse(url, parse_techcrunch_html, source_name, headers=DEFAULT_HEADERS, logger=logger)
     except Exception as e:
         if logger: logger.error(f"获取TechCrunch新闻时出错: {e}")
+        source_health.report_error(source_name, e)
         return []
 
-def get_generic_news(url, source_name, logger=None):
-    """通用新闻获取方法"""
-    try:
-        if logger: logger.debug(f"初始化Chrome浏览器配置(通用方法)...")
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-dev-tools-bridge")
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_argument("--disable-plugins")
-        chrome_options.add_argument("--disable-images")
-        chrome_options.add_argument("--disable-javascript-har-promises")
-        chrome_options.add_argument("--disable-web-security")
-        chrome_options.add_argument("--no-first-run")
-        chrome_options.add_argument("--disable-default-apps")
-        chrome_options.add_argument("--disable-background-timer-throttling")
-        chrome_options.add_argument("--disable-renderer-backgrounding")
-        chrome_options.add_argument("--disable-features=TranslateUI")
-        chrome_options.add_argument("--disable-ipc-flooding-protection")
-        chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-        
-        # 设置二进制路径和驱动
-        chrome_options.binary_location = "/usr/bin/google-chrome-stable"
-        service = Service(executable_path="/usr/bin/chromedriver")
-        
-        if logger: logger.debug(f"启动Chrome浏览器(通用方法)...")
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        if logger: logger.debug(f"正在访问页面(通用方法): {url}")
-        driver.get(url)
-        
-        if logger: logger.debug(f"等待页面加载(通用方法)...")
-        wait = WebDriverWait(driver, 30)
-        try:
-            wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        except:
-            if logger: logger.warning(f"页面加载超时，继续处理")
-        
-        if logger: logger.debug(f"获取页面源码(通用方法)...")
-        page_source = driver.page_source
-        if logger: logger.debug(f"页面源码长度(通用方法): {len(page_source)} 字符")
-        
-        if logger: logger.debug(f"关闭浏览器(通用方法)...")
-        driver.quit()
-        
-        soup = BeautifulSoup(page_source, "html.parser")
-        articles = []
-        
-        news_items = soup.find_all("a", class_=["title", "article-title", "entry-title", "post-title"])
-        
-        for item in news_items:
-            title = item.get_text(strip=True)
-            if len(title) < 5:
-                continue
-                
-            link = item.get("href", "")
-            if not link:
-                continue
-            
-            date = datetime.now().strftime("%m月%d日")
+@lazy_parser
+def parse_generic_html(html, source_name, page_url=""):
+    """通用页面解析方法，链接相对于页面地址page_url解析"""
+    title_classes = ["title", "article-title", "entry-title", "post-title"]
+    # 只需要标题链接，其余元素不构建
+    soup = make_soup(html, source_name, parse_only=anchors_with_class(title_classes))
+    
+    news_items = soup.find_all("a", class_=title_classes)
+    
+    for item in news_items:
+        title = item.get_text(strip=True)
+        if len(title) < 5:
+            continue
             
-            articles.append({"title": title, "link": link, "date": date, "source": source_name})
+        link = resolve_link(page_url, item.get("href"))
+        if not link:
+            continue
         
+        yield Article(title, link, source_name)
+
+def get_generic_news_rendered(url, source_name, logger=None):
+    """通过浏览器渲染获取通用新闻"""
+    # 页面未变化时直接复用上次的解析结果，无需渲染
+    cached_articles, validators = http_cache.revalidate(url, source_name, headers=DEFAULT_HEADERS, logger=logger)
+    if cached_articles is not None:
+        return cached_articles
+    
+    page_source = render_page(url, logger=logger)
+    if logger: logger.debug(f"页面源码长度(通用方法): {len(page_source)} 字符")
+    
+    articles = parse_generic_html(page_source, source_name, page_url=url)
+    http_cache.save_entry(url, source_name, validators, articles)
+    return articles
+
+def get_fetch_tier(source_name):
+    """返回该源上次成功使用的抓取层级("static"/"browser")；超过复查周期的"browser"层级返回None以重新尝试静态抓取"""
+    record = source_state.get_value("fetch_tier", source_name)
+    if not record:
+        return None
+    if record.get("tier") == "browser" and time.time() - record.get("updated_at", 0) > FETCH_TIER_RECHECK_DAYS * 86400:
+        return None
+    return record.get("tier")
+
+def remember_fetch_tier(source_name, tier):
+    """记录该源成功使用的抓取层级"""
+    record = source_state.get_value("fetch_tier", source_name) or {}
+    if record.get("tier") != tier:
+        source_state.set_value("fetch_tier", source_name, {"tier": tier, "updated_at": time.time()})
+
+def get_generic_news(url, source_name, logger=None):
+    """通用新闻获取方法：先尝试静态抓取，文章数不足时再升级到浏览器渲染"""
+    try:
+        tier = get_fetch_tier(source_name)
+        if tier != "browser":
+            try:
+                # 静态层级使用独立的缓存条目，避免与渲染结果混用
+                articles = http_cache.fetch_and_parse(url, feed_discovery.recording_parser(
+                                                          functools.partial(parse_generic_html, page_url=url), url),
+                                                      source_name, headers=DEFAULT_HEADERS,
+                                                      cache_name=f"{source_name}#static",
+                                                      max_age=HTTP_CACHE_RENDERED_MAX_AGE, logger=logger)
+            except Exception as e:
+                if logger: logger.warning(f"{source_name} 静态抓取失败: {e}")
+                articles = []
+            if len(articles) >= GENERIC_STATIC_MIN_ARTICLES:
+                remember_fetch_tier(source_name, "static")
+                return articles
+            if logger: logger.info(f"{source_name} 静态抓取仅得到 {len(articles)} 条文章，升级到浏览器渲染")
+        
+        articles = get_generic_news_rendered(url, source_name, logger)
+        if articles:
+            remember_fetch_tier(source_name, "browser")
         return articles
     except Exception as e:
         if logger: logger.error(f"获取通用新闻时出错: {e}")
+        source_health.report_error(source_name, e)
         return []
 
+def build_rss_article(title, link, published, source_name):
+    """把一条订阅条目转换为Article，非AI相关或字段不全时返回None"""
+    if not title or len(title.strip()) < 5:
+        return None
+    if not link:
+        return None
+    
+    # 筛选AI相关新闻
+    if not is_ai_related(title):
+        return None
+    
+    # 发布时间：RSS为RFC 822格式，Atom为ISO 8601格式，feedparser给出已解析的struct_time
+    return Article(title, link, source_name, published=parse_datetime(published))
+
+@lazy_parser
+def parse_rss_feed(content, source_name):
+    """解析RSS/ATOM内容中的AI新闻（feedparser容错解析，用于不规范的订阅）"""
+    feed = feedparser.parse(content)
+    
+    for entry in feed.entries:
+        link = entry.get('feedburner_origlink') or entry.get('link', '')
+        published = entry.get('published_parsed') or entry.get('updated_parsed') or entry.get('published', '')
+        article = build_rss_article(entry.get('title', ''), link, published, source_name)
+        if article:
+            yield article
+
+@lazy_parser
+def parse_rss_stream(stream, source_name):
+    """流式解析RSS/ATOM中的AI新闻，取够MAX_ARTICLES_PER_SOURCE条后停止读取"""
+    for entry in feed_stream.iter_feed_entries(stream):
+        article = build_rss_article(entry["title"], entry["link"], entry["published"], source_name)
+        if article:
+            yield article
+
 def get_rss_news(url, source_name, logger=None):
     """获取RSS/ATOM新闻"""
     try:
-        feed = feedparser.parse(url)
-        articles = []
-        
-        for entry in feed.entries:
-            title = entry.get('title', '')
-            if not title or len(title.strip()) < 5:
-                continue
-                
-            link = entry.get('link', '')
-            if not link:
-                continue
-            
-            # 筛选AI相关新闻
-            title_lower = title.lower()
-            ai_keywords = ["ai", "artificial intelligence", "machine learning", "deep learning", "neural", 
-                          "algorithm", "model", "chatgpt", "openai", "gpt", "transformer", "llm",
-                          "人工智能", "机器学习", "深度学习", "智能", "算法", "大模型"]
-            
-            if not any(keyword in title_lower for keyword in ai_keywords):
-                continue
-            
-            # 获取日期
-            date = datetime.now().strftime("%m月%d日")
-            if 'published' in entry:
-                try:
-                    pub_date = datetime.strptime(entry.published, '%a, %d %b %Y %H:%M:%S %z')
-                    date = pub_date.strftime("%m月%d日")
-                except:
-                    pass
-            
-            articles.append({
-                "title": title.strip(),
-                "link": link,
-                "date": date,
-                "source": source_name
-            })
-        
-        return articles
+        # 通过共享会话发送条件请求（带超时），边下载边解析，取够条目后不再读取剩余内容
+        try:
+            return http_cache.fetch_and_parse(url, parse_rss_stream, source_name, headers=DEFAULT_HEADERS,
+                                              stream=True, logger=logger)
+        except feed_stream.ParseError as e:
+            # 订阅不是规范的XML（如含HTML实体），改用容错的feedparser重新获取并解析
+            if logger: logger.warning(f"{source_name} 订阅无法流式解析({e})，改用feedparser")
+            return http_cache.fetch_and_parse(url, parse_rss_feed, source_name, headers=DEFAULT_HEADERS,
+                                              binary=True, logger=logger)
     except Exception as e:
         if logger: logger.error(f"获取RSS新闻时出错: {e}")
+        source_health.report_error(source_name, e)
+        return []
+
+def is_sitemap_source(source_name):
+    """判断是否为新闻站点地图源（名称以Sitemap结尾或包含sitemap）"""
+    return source_name.endswith("Sitemap") or "sitemap" in source_name.lower()
+
+def get_sitemap_news(url, source_name, logger=None):
+    """从Google News站点地图获取新闻，只读取lastmod晚于上次已发送的高水位的条目
+
+    站点地图中的条目不按时间排序，读完全部条目后保留lastmod最新的MAX_ARTICLES_PER_SOURCE条AI新闻，
+    高水位取实际返回的条目中最新的lastmod，未返回的更新条目不会被高水位跳过。
+    """
+    try:
+        watermark = sitemap_reader.get_watermark(source_name)
+        
+        def candidates():
+            for link, lastmod, title in sitemap_reader.read_new_entries(url, watermark, headers=DEFAULT_HEADERS,
+                                                                        max_children=SITEMAP_MAX_CHILDREN,
+                                                                        logger=logger):
+                # 筛选AI相关新闻
+                if title and len(title) >= 5 and is_ai_related(title):
+                    yield Article(title, link, source_name, published=lastmod)
+        
+        # 只保留最新的N条，内存占用与站点地图大小无关；没有lastmod的条目排在最后
+        articles = heapq.nlargest(MAX_ARTICLES_PER_SOURCE, candidates(),
+                                  key=lambda article: article.published.timestamp() if article.published else float("-inf"))
+        newest = max((article.published for article in articles if article.published), default=watermark)
+        
+        # 高水位在日报发送成功后才写入，发送失败时下次运行仍会读到这些条目
+        if newest and newest != watermark:
+            sitemap_reader.stage_watermark(source_name, newest)
+        if logger: logger.info(f"{source_name} 站点地图新增 {len(articles)} 条AI新闻 (高水位: {newest.isoformat() if newest else '无'})")
+        return articles
+    except Exception as e:
+        if logger: logger.error(f"获取站点地图新闻时出错: {e}")
+        source_health.report_error(source_name, e)
         return []
 
+@lazy_parser
+def parse_api_json(text, source_name):
+    """解析API返回的JSON新闻数据"""
+    data = json.loads(text)
+    
+    # 处理不同的API响应格式
+    if isinstance(data, dict):
+        # 尝试不同的API响应格式
+        articles_data = []
+        
+        # 格式1: {articles: [...]}
+        if 'articles' in data:
+            articles_data = data['articles']
+        # 格式2: {data: [...]}
+        elif 'data' in data and isinstance(data['data'], list):
+            articles_data = data['data']
+        # 格式3: {items: [...]}
+        elif 'items' in data:
+            articles_data = data['items']
+        # 格式4: {results: [...]}
+        elif 'results' in data:
+            articles_data = data['results']
+        # 格式5: {response: {docs: [...]}}
+        elif 'response' in data and isinstance(data['response'], dict) and 'docs' in data['response']:
+            articles_data = data['response']['docs']
+        
+        for item in articles_data:
+            if isinstance(item, dict):
+                title = item.get('title', item.get('headline', item.get('name', '')))
+                link = item.get('url', item.get('link', item.get('href', '')))
+                
+                if not title or len(title.strip()) < 5:
+                    continue
+                
+                if not link:
+                    continue
+                
+                # 筛选AI相关新闻
+                if not is_ai_related(title):
+                    continue
+                
+                # 获取发布时间
+                pub_date = item.get('publishedAt', item.get('published_date', item.get('date', '')))
+                yield Article(title, link, source_name, published=parse_datetime(pub_date))
+
 def get_api_news(url, source_name, logger=None):
     """获取API新闻"""
     try:
-        # 设置请求头
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-            "Accept": "application/json"
-        }
-        
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        
-        data = response.json()
-        articles = []
-        
-        # 处理不同的API响应格式
-        if isinstance(data, dict):
-            # 尝试不同的API响应格式
-            articles_data = []
-            
-            # 格式1: {articles: [...]}
-            if 'articles' in data:
-                articles_data = data['articles']
-            # 格式2: {data: [...]}
-            elif 'data' in data and isinstance(data['data'], list):
-                articles_data = data['data']
-            # 格式3: {items: [...]}
-            elif 'items' in data:
-                articles_data = data['items']
-            # 格式4: {results: [...]}
-            elif 'results' in data:
-                articles_data = data['results']
-            # 格式5: {response: {docs: [...]}}
-            elif 'response' in data and isinstance(data['response'], dict) and 'docs' in data['response']:
-                articles_data = data['response']['docs']
-            
-            for item in articles_data:
-                if isinstance(item, dict):
-                    title = item.get('title', item.get('headline', item.get('name', '')))
-                    link = item.get('url', item.get('link', item.get('href', '')))
-                    
-                    if not title or len(title.strip()) < 5:
-                        continue
-                    
-                    if not link:
-                        continue
-                    
-                    # 筛选AI相关新闻
-                    title_lower = title.lower()
-                    ai_keywords = ["ai", "artificial intelligence", "machine learning", "deep learning", "neural", 
-                                  "algorithm", "model", "chatgpt", "openai", "gpt", "transformer", "llm",
-                                  "人工智能", "机器学习", "深度学习", "智能", "算法", "大模型"]
-                    
-                    if not any(keyword in title_lower for keyword in ai_keywords):
-                        continue
-                    
-                    # 获取日期
-                    date = datetime.now().strftime("%m月%d日")
-                    pub_date = item.get('publishedAt', item.get('published_date', item.get('date', '')))
-                    if pub_date:
-                        try:
-                            # 尝试解析不同的日期格式
-                            for date_format in ['%Y-%m-%d', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%d %H:%M:%S']:
-                                try:
-                                    pub_date_obj = datetime.strptime(pub_date, date_format)
-                                    date = pub_date_obj.strftime("%m月%d日")
-                                    break
-                                except:
-                                    continue
-                        except:
-                            pass
-                    
-                    articles.append({
-                        "title": title.strip(),
-                        "link": link,
-                        "date": date,
-                        "source": source_name
-                    })
-        
-        return articles
+        return http_cache.fetch_and_parse(url, parse_api_json, source_name, headers=API_HEADERS, logger=logger)
     except Exception as e:
         if logger: logger.error(f"获取API新闻时出错: {e}")
+        source_health.report_error(source_name, e)
         return []
 
+# 静态源解析器注册表: 源名称 -> (请求头, 解析函数)，供异步抓取引擎直接抓取并解析
+STATIC_SOURCE_PARSERS = {
+    "36氪": (KR36_HEADERS, parse_36kr_html),
+    "InfoQ": (DEFAULT_HEADERS, parse_infoq_html),
+    "AMiner": (DEFAULT_HEADERS, parse_aminer_html),
+    "雷锋网": (DEFAULT_HEADERS, parse_leiphone_html),
+    "VentureBeat": (DEFAULT_HEADERS, parse_venturebeat_html),
+    "TechCrunch": (DEFAULT_HEADERS, parse_techcrunch_html),
+}
+
+def get_static_parser(source_name):
+    """返回静态源的(请求头, 解析函数)，需要浏览器或RSS的源返回None，路由规则与get_ai_news_from_source一致"""
+    if source_name in STATIC_SOURCE_PARSERS:
+        return STATIC_SOURCE_PARSERS[source_name]
+    if is_rss_source(source_name) or is_sitemap_source(source_name):
+        return None
+    if source_name.endswith("API") or "api" in source_name.lower():
+        return API_HEADERS, parse_api_json
+    return None
+
+def is_rss_source(source_name):
+    """判断是否为RSS/ATOM源，规则与get_ai_news_from_source一致"""
+    return source_name.endswith("RSS") or "rss" in source_name.lower()
+
+def uses_browser(source_name):
+    """判断新闻源是否可能需要浏览器渲染（非静态源、非RSS源，且未记住静态抓取层级）"""
+    if get_static_parser(source_name):
+        return False
+    if is_rss_source(source_name) or is_sitemap_source(source_name):
+        return False
+    return get_fetch_tier(source_name) != "static"
+
+def fetch_via_feed(source, feed_url, logger=None):
+    """通过订阅地址获取HTML源的新闻，订阅没有返回文章时回退到原有的页面抓取方式"""
+    if logger: logger.info(f"{source['name']} 使用订阅地址获取新闻: {feed_url}")
+    articles = get_rss_news(feed_url, source["name"], logger)
+    if articles:
+        return articles
+    if logger: logger.warning(f"{source['name']} 订阅未返回文章，回退到页面抓取")
+    # 记为不可用，之后的运行改用页面声明的其他订阅或直接抓取页面，重新发现时也不再采用该地址
+    if source.get("feed", "auto") != feed_url:
+        feed_discovery.reject_feed(source["name"], feed_url)
+    return get_ai_news_from_source(source["url"], source["name"], logger)
+
+def stream_source_results(sources, logger=None, quota=None):
+    """并发抓取多个新闻源，按sources顺序逐个产出(源位置, 文章列表)
+
+    所有源在同一个线程池中执行，静态页面/API源直接用注册的解析函数(STATIC_SOURCE_PARSERS)解析响应；
+    同一主机同时最多抓取FETCH_MAX_PER_HOST个源。
+    每个源从开始抓取时计算独立的截止时间（根据历史耗时自适应，不超过SOURCE_FETCH_TIMEOUT），
+    整个阶段受全局截止时间(FETCH_GLOBAL_TIMEOUT)约束。熔断中的源(source_health)直接跳过，其余源的结果计入健康度记录。
+    结果乱序完成，但只要前面的源都已完成就立即产出，下游无需等待全部源抓取结束；
+    传入quota(article_selection.PriorityQuota)时，已不可能影响选择结果的源不再等待。
+    超时、失败、跳过或被取消的源产出空列表；下游提前停止迭代时取消尚未开始的抓取。
+    """
+    if not sources:
+        return
+
+    started_at = {}
+    finished_at = {}
+    ready = {}
+
+    def fetch(index, source):
+        url = feed_urls.get(index, source["url"])
+        # 等待同一主机的其他源时还未开始抓取，不计入该源的截止时间
+        with host_slots[urlparse(url).netloc.lower()]:
+            started_at[index] = time.monotonic()
+            try:
+                # 截止时间之后不再退避重试，避免被放弃的任务继续占用线程
+                with retry_policy.deadline_scope(min(timeouts[index], max(global_deadline - started_at[index], 0.1))):
+                    if index in feed_urls:
+                        return fetch_via_feed(source, url, logger)
+                    static_parser = get_static_parser(source["name"])
+                    if static_parser:
+                        headers, parser = static_parser
+                        # 解析页面时顺带记录页面声明的订阅地址
+                        return http_cache.fetch_and_parse(url, feed_discovery.recording_parser(parser, url),
+                                                          source["name"], headers=headers, logger=logger)
+                    return get_ai_news_from_source(url, source["name"], logger)
+            finally:
+                finished_at[index] = time.monotonic()
+
+    def collect(future):
+        index = future_to_index[future]
+        source = sources[index]
+        elapsed = finished_at.get(index, 0) - started_at.get(index, 0)
+        try:
+            ready[index] = future.result() or []
+            if logger:
+                logger.info(f"{source['name']} 抓取完成: {len(ready[index])} 条, 耗时 {elapsed:.1f}秒")
+            source_health.record_result(source["name"], len(ready[index]), elapsed, logger=logger)
+        except Exception as e:
+            if logger:
+                logger.error(f"从 {source['name']} 获取新闻时出错: {e}")
+            source_health.record_result(source["name"], 0, elapsed, error=e, logger=logger)
+            ready[index] = []
+
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=max(1, min(FETCH_MAX_WORKERS, len(sources))),
+        thread_name_prefix="news-fetch"
+    )
+    host_slots = defaultdict(lambda: threading.BoundedSemaphore(max(1, FETCH_MAX_PER_HOST)))
+    # 熔断中的源本次不抓取
+    skipped = {index for index, source in enumerate(sources) if source_health.should_skip(source["name"], logger)}
+    for index in skipped:
+        ready[index] = []
+
+    # 按历史耗时为每个源设置截止时间，响应快的源卡住时能尽早放弃
+    timeouts = {}
+    for index, source in enumerate(sources):
+        timeouts[index] = source_health.adaptive_timeout(source["name"], SOURCE_FETCH_TIMEOUT)
+        if logger and timeouts[index] < SOURCE_FETCH_TIMEOUT and index not in skipped:
+            logger.debug(f"{source['name']} 自适应截止时间: {timeouts[index]:.1f}秒")
+
+    # 已发现(或配置了)订阅地址的HTML源改用RSS方式获取
+    feed_urls = {}
+    for index, source in enumerate(sources):
+        if index in skipped:
+            continue
+        if not is_rss_source(source["name"]) and not is_sitemap_source(source["name"]):
+            feed_url = feed_discovery.get_feed_url(source)
+            if feed_url:
+                feed_urls[index] = feed_url
+
+    # 有需要渲染的源时，在后台预热浏览器池，与其他源的抓取并行
+    if any(uses_browser(source["name"]) for index, source in enumerate(sources)
+           if index not in feed_urls and index not in skipped):
+        get_browser_pool(logger).warm_up()
+
+    global_deadline = time.monotonic() + FETCH_GLOBAL_TIMEOUT
+    future_to_index = {}
+    for index, source in enumerate(sources):
+        if index in skipped:
+            continue
+        if logger:
+            logger.info(f"提交抓取任务: {source['name']} (优先级: {source.get('priority', 3)})")
+        future_to_index[executor.submit(fetch, index, source)] = index
+    pending = set(future_to_index)
+    next_index = 0
+
+    try:
+        while True:
+            # 先收集已完成的任务，再检查截止时间
+            for future in [f for f in pending if f.done()]:
+                pending.discard(future)
+                collect(future)
+
+            # 产出从next_index开始连续完成的结果，下游处理完后再继续
+            while next_index in ready:
+                yield next_index, ready.pop(next_index)
+                next_index += 1
+
+            # 已选出的文章填满了之后所有源涉及的优先级配额（或总数已满）时，不再等待这些源
+            cutoff = quota.cutoff(next_index) if quota is not None else None
+            if cutoff is not None:
+                for future in [f for f in pending if future_to_index[f] >= cutoff]:
+                    pending.discard(future)
+                    future.cancel()
+                    if logger:
+                        logger.info(f"{sources[future_to_index[future]]['name']} 已不影响选择结果(配额已满)，不再等待")
+            if not pending:
+                break
+
+            now = time.monotonic()
+            if now >= global_deadline:
+                for future in pending:
+                    future.cancel()
+                    index = future_to_index[future]
+                    if logger:
+                        logger.warning(f"{sources[index]['name']} 超过全局抓取截止时间({FETCH_GLOBAL_TIMEOUT}秒)，已放弃")
+                    start = started_at.get(index)
+                    if start is not None:
+                        source_health.record_result(sources[index]["name"], 0, now - start,
+                                                    error=TimeoutError(), logger=logger)
+                break
+
+            # 放弃已超过单源截止时间的任务（线程无法强制终止，但不再等待其结果）
+            wake_at = min(global_deadline, now + SOURCE_FETCH_TIMEOUT)
+            for future in list(pending):
+                index = future_to_index[future]
+                start = started_at.get(index)
+                if start is None:
+                    continue
+                if now - start >= timeouts[index]:
+                    pending.discard(future)
+                    ready[index] = []
+                    source_name = sources[index]['name']
+                    if logger:
+                        logger.warning(f"{source_name} 超过单源抓取截止时间({timeouts[index]:.1f}秒)，已放弃")
+                    source_health.record_result(source_name, 0, now - start, error=TimeoutError(), logger=logger)
+                else:
+                    wake_at = min(wake_at, start + timeouts[index])
+            if not pending:
+                continue
+
+            concurrent.futures.wait(pending, timeout=max(wake_at - now, 0.05),
+                                    return_when=concurrent.futures.FIRST_COMPLETED)
+
+        # 剩余的源（被放弃或已无意义）产出空列表
+        for index in range(next_index, len(sources)):
+            yield index, ready.pop(index, [])
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        source_health.log_health_report([source["name"] for source in sources], logger)
+
 def get_ai_news(logger=None):
     """从多个数据源获取AI新闻，按照优先级排序"""
-    all_articles = []
-    
     # 从配置文件获取启用的数据源，并按优先级排序
     enabled_sources = [source for source in NEWS_SOURCES if source.get("enabled", True)]
     enabled_sources.sort(key=lambda x: x.get("priority", 3), reverse=True)
     
-    # 从每个数据源获取新闻
-    for source in enabled_sources:
-        logger.info(f"正在从 {source['name']} (优先级: {source.get('priority', 3)}) 获取新闻...")
-        articles = get_ai_news_from_source(source["url"], source["name"], logger)
-        
-        # 为每篇文章添加优先级信息
-        priority = source.get("priority", 3)
-        for article in articles:
-            article["priority"] = priority
-        
-        # 限制每个源的文章数量
-        articles = articles[:MAX_ARTICLES_PER_SOURCE]
-        all_articles.extend(articles)
-    
-    # 去重 - 优先基于标题去重，避免重复内容
-    seen_titles = set()
-    unique_articles = []
-    for article in all_articles:
-        # 清理标题，去除多余空格和特殊字符
-        clean_title = article["title"].strip()
-        # 使用标题作为去重的主要依据
-        if clean_title not in seen_titles and len(clean_title) > 10:
-            seen_titles.add(clean_title)
-            unique_articles.append(article)
-    
-    # 按优先级排序文章
-    unique_articles.sort(key=lambda x: x.get("priority", 3), reverse=True)
-    
-    # 根据优先级限制文章数量
-    priority_articles = []
-    priority_counts = {5: 0, 4: 0, 3: 0, 2: 0, 1: 0}
-    
-    for article in unique_articles:
-        priority = article.get("priority", 3)
-        if priority_counts[priority] < MAX_ARTICLES_PER_PRIORITY.get(priority, 4):
-            priority_articles.append(article)
-            priority_counts[priority] += 1
-        
-        # 如果已经获取足够多的文章，提前退出
-        if len(priority_articles) >= MAX_TOTAL_ARTICLES:
-            break
-    
-    return priority_articles
+    # 抓取结果按优先级顺序流入选择管道：每源截断、基于标题去重、按优先级配额选择；
+    # 配额填满后不再等待剩余的低优先级源，输出与抓取全部源后再选择一致
+    quota = PriorityQuota(enabled_sources)
+    with closing(stream_source_results(enabled_sources, logger, quota=quota)) as source_results:
+        return list(build_pipeline(source_results, enabled_sources, quota))
+
+def format_sources(news):
+    """来源说明，多个源报道了同一事件时附上其他源"""
+    if news.coverage > 1:
+        return f"{news.source}（{'、'.join(news.sources[1:])}等{news.coverage}家报道）"
+    return news.source
 
 def summarize_news(news_list, logger=None, provider_name=None):
     """使用AI对新闻列表进行摘要"""
@@ -843,18 +1037,21 @@ def summarize_news(news_list, logger=None, provider_name=None):
         # 构建包含来源信息的新闻文本
         news_items = []
         for news in news_list:
-            if "source" in news:
-                news_items.append(f'标题: {news["title"]} (来源: {news["source"]}, 日期: {news["date"]})')
-            else:
-                news_items.append(f'标题: {news["title"]} (日期: {news["date"]})')
+            news_items.append(f'标题: {news.title} (来源: {format_sources(news)}, 日期: {news.date})')
         news_text = "\n".join(news_items)
         
-        response = client.chat.completions.create(
-            model=provider_config["model"],
-            messages=[
-                {"role": "user", "content": f"请总结以下AI新闻，提取关键信息和趋势:\n{news_text}"}
-            ],
-            max_tokens=provider_config["max_tokens"]
+        # 连接失败、超时、限流和服务端错误时退避重试
+        response = retry_policy.call_with_retry(
+            lambda: client.chat.completions.create(
+                model=provider_config["model"],
+                messages=[
+                    {"role": "user", "content": f"请总结以下AI新闻，提取关键信息和趋势:\n{news_text}"}
+                ],
+                max_tokens=provider_config["max_tokens"]
+            ),
+            description=f"{provider_config['name']} 摘要请求",
+            retry_on=(APIConnectionError, RateLimitError, InternalServerError),
+            logger=logger
         )
         if logger:
             logger.debug(f"API响应: {response}")
@@ -958,12 +1155,9 @@ def send_to_feishu(webhook_url, summary, news_list, image_key=None, logger=None)
         
         # 添加新闻条目
         for i, news in enumerate(news_list[:10], 1):  # 限制最多显示10条新闻
-            # 构建新闻条目内容，包含来源信息（如果有）
-            if "source" in news:
-                news_content = f"{i}. [{news['title']}]({news['link']}) 来源: {news['source']} 日期: {news['date']}"
-            else:
-                news_content = f"{i}. [{news['title']}]({news['link']}) 日期: {news['date']}"
-                
+            # 构建新闻条目内容，包含来源信息
+            news_content = f"{i}. [{news.title}]({news.link}) 来源: {format_sources(news)} 日期: {news.date}"
+            
             card_elements.append({
                 "tag": "div",
                 "text": {
@@ -991,7 +1185,9 @@ def send_to_feishu(webhook_url, summary, news_list, image_key=None, logger=None)
             }
         }
             
-        response = requests.post(webhook_url, headers=headers, data=json.dumps(data, ensure_ascii=False).encode('utf-8'))
+        # 只在服务器确定未处理时重试（连接未建立、429/503），避免群里收到重复消息
+        response = http_client.post(webhook_url, headers=headers, data=json.dumps(data, ensure_ascii=False).encode('utf-8'),
+                                    logger=logger)
         response.raise_for_status()
         if logger:
             logger.info("消息已成功发送到飞书")
@@ -1014,12 +1210,15 @@ def upload_image_to_feishu(image_path, access_token, logger=None):
             "Authorization": f"Bearer {access_token}",
         }
         
+        # 读入内存，重试时可以重新发送
+        with open(image_path, "rb") as image_file:
+            image_data = image_file.read()
         files = {
             "image_type": (None, "message"),
-            "image": (os.path.basename(image_path), open(image_path, "rb"), "image/jpeg") 
+            "image": (os.path.basename(image_path), image_data, "image/jpeg")
         }
         
-        response = requests.post(upload_url, headers=headers, files=files)
+        response = http_client.post(upload_url, headers=headers, files=files, logger=logger)
         response.raise_for_status()
         
         result = response.json()
@@ -1170,7 +1369,7 @@ def send_to_multiple_webhooks(summary, news_list, image_key=None, logger=None):
         for config in enabled_webhooks:
             # 根据配置决定是否发送图片
             webhook_image_key = image_key if config["send_image"] else None
-            future = executor.submit(send_to_feishu, config["url"], summary, news_list, webhook_image_key, config["name"])
+            future = executor.submit(send_to_feishu, config["url"], summary, news_list, webhook_image_key, logger)
             future_to_config[future] = config
         
         # 等待所有任务完成
@@ -1303,6 +1502,10 @@ def main():
     # 打印模型供应商配置
     print_model_provider_configs(logger)
     
+    # 重置本次运行的重试预算，读取之前运行积累的主机延迟样本（用于对冲请求）
+    retry_policy.reset_budget()
+    retry_policy.load_latencies()
+    
     # 初始化PySpark环境（如果可用）
     spark = None
     if PYSPARK_AVAILABLE:
@@ -1360,6 +1563,8 @@ def main():
             
             if send_success:
                 logger.info("[SUCCESS] AI日报已成功发送到所有配置的webhook")
+                sent_history.record_sent(ai_news, logger)
+                sitemap_reader.commit_watermarks(logger)
             else:
                 logger.warning("[WARNING] 部分webhook发送失败，请检查日志")
             
@@ -1372,6 +1577,15 @@ def main():
         logger.error(f"[ERROR] 详细错误信息:\n{traceback.format_exc()}")
         
     finally:
+        # 输出连接复用和重试统计并关闭共享会话
+        http_client.log_connection_stats(logger)
+        retry_policy.log_retry_stats(logger)
+        retry_policy.save_latencies()
+        http_client.close_all_sessions()
+        
+        # 关闭浏览器池中的Chrome实例
+        shutdown_browser_pool()
+        
         # 清理PySpark资源
         if spark:
             logger.info("正在清理PySpark资源...")
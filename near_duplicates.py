@@ -0,0 +1,109 @@
+# 近似重复检测
+# 同一事件常被36氪、机器之心、雷锋网等以不同标题报道。标题经NFKC规范化（全角字母数字和标点折叠为半角）、
+# 忽略大小写并去掉标点后切分为词元：汉字逐字，英文单词和数字整体；以单个词元和相邻词元对作为特征集合，
+# 计算MinHash签名并分段建立LSH索引，只与落入同一分段桶的候选比较精确的Jaccard相似度，
+# 每篇文章的检测耗时与已有文章数量基本无关。
+# 短标题只差一个名称或数字时相似度也很高（"英伟达/AMD发布新一代AI芯片"、"Gemini 2.5 Pro/Flash"、"10亿/20亿美元"），
+# 因此两个标题各有对方没有的词元、且差异中包含名称或数字（含大写字母或数字的英文词元）时，直接判为不同事件。
+
+import random
+import re
+import unicodedata
+import zlib
+
+from config import NEAR_DUPLICATE_THRESHOLD
+
+MINHASH_PERMUTATIONS = 64
+# 32段×每段2行：Jaccard约0.2以上的标题大概率成为候选，再由精确相似度判断
+LSH_BANDS = 32
+_MERSENNE_PRIME = (1 << 61) - 1
+
+_random = random.Random(20240601)
+_PERMUTATIONS = [(_random.randrange(1, _MERSENNE_PRIME), _random.randrange(0, _MERSENNE_PRIME))
+                 for _ in range(MINHASH_PERMUTATIONS)]
+
+_CJK = r"\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"  # 假名和汉字
+TOKEN_PATTERN = re.compile(rf"[{_CJK}]|[^\W_{_CJK}]+")
+
+
+def tokenize(text):
+    """规范化并切分为词元：汉字逐字，其余连续的字母数字为一个词元，标点和空白丢弃"""
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    return TOKEN_PATTERN.findall(text)
+
+
+def entities(text):
+    """标题中的名称和数字：含大写字母或数字的英文/数字词元（如"AMD"、"Pro"、"2B"），统一为小写"""
+    text = unicodedata.normalize("NFKC", text or "")
+    return {token.casefold() for token in TOKEN_PATTERN.findall(text)
+            if token.isascii() and any(char.isupper() or char.isdigit() for char in token)}
+
+
+def shingles(text):
+    """标题的特征集合：单个词元和相邻词元对"""
+    tokens = tokenize(text)
+    features = set(tokens)
+    features.update(f"{first} {second}" for first, second in zip(tokens, tokens[1:]))
+    return features
+
+
+def minhash(features):
+    """特征集合的MinHash签名"""
+    values = [zlib.crc32(feature.encode("utf-8")) for feature in features]
+    if not values:
+        return ()
+    return tuple(min((a * value + b) % _MERSENNE_PRIME for value in values) for a, b in _PERMUTATIONS)
+
+
+def jaccard(first, second):
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def conflicting(first, second, first_entities, second_entities):
+    """两个标题各有对方没有的词元，且其中有名称或数字时视为不同事件（换了公司、型号或金额）；
+    只是一方多出词元（补充说明）或只替换了普通词语（改写）时不算冲突"""
+    first_only = {feature for feature in first - second if " " not in feature}
+    second_only = {feature for feature in second - first if " " not in feature}
+    if not first_only or not second_only:
+        return False
+    return bool(first_only & first_entities or second_only & second_entities)
+
+
+
+class NearDuplicateIndex:
+    """MinHash LSH索引：登记已接受的文本，查询与新文本相似度不低于threshold的已登记条目"""
+
+    def __init__(self, threshold=NEAR_DUPLICATE_THRESHOLD, bands=LSH_BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = MINHASH_PERMUTATIONS // bands
+        self._buckets = {}
+        self._entries = []
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, signature[start:start + self.rows]
+
+    def find(self, features, signature, title_entities=frozenset()):
+        """返回最相似、达到阈值且名称数字不冲突的已登记条目，没有时返回None"""
+        best, best_score = None, self.threshold
+        seen = set()
+        for key in self._band_keys(signature):
+            for index in self._buckets.get(key, ()):
+                if index in seen:
+                    continue
+                seen.add(index)
+                item, item_features, item_entities = self._entries[index]
+                score = jaccard(features, item_features)
+                if score >= best_score and not conflicting(features, item_features, title_entities, item_entities):
+                    best, best_score = item, score
+        return best
+
+    def add(self, item, features, signature, title_entities=frozenset()):
+        index = len(self._entries)
+        self._entries.append((item, features, title_entities))
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, []).append(index)
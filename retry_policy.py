@@ -0,0 +1,286 @@
+# 重试与退避
+# 统一的重试层：按错误类型和HTTP状态码判断是否可重试，指数退避加随机抖动，
+# 整次运行共享一个重试预算防止故障时形成重试风暴；可选的对冲请求在耗时超过历史延迟分位数时
+# 再发一个相同请求，取先成功者以降低长尾延迟。各主机的延迟样本保存在source_state中跨运行累积，
+# 每天只运行一次、每个主机只请求一两次时也能达到HTTP_HEDGE_MIN_SAMPLES。
+
+import concurrent.futures
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+import source_state
+from config import (RETRY_COUNT, RETRY_DELAY, RETRY_MAX_DELAY, RETRY_BUDGET,
+                    HTTP_HEDGE_PERCENTILE, HTTP_HEDGE_MIN_SAMPLES)
+
+# 服务器暂时不可用或限流，稍后重试可能成功的状态码
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+# 非幂等请求(POST)只在确定服务器未处理请求时重试：限流(429)和服务不可用(503)；
+# 网关错误(502/504)时后端可能已经处理了请求（如飞书已发出消息），不重试
+NON_IDEMPOTENT_RETRYABLE_STATUS = {429, 503}
+
+_state = threading.local()
+_lock = threading.Lock()
+_stats = {"retries": 0, "hedges": 0, "hedge_wins": 0, "budget_exhausted": 0}
+_budget_used = 0
+_latencies = {}
+_hedge_executor = None
+
+LATENCY_NAMESPACE = "host_latency"
+LATENCY_SAMPLES = 50
+
+
+def try_spend_budget():
+    """从本次运行的重试预算中扣除一次，预算用完时返回False"""
+    global _budget_used
+    with _lock:
+        if _budget_used >= RETRY_BUDGET:
+            _stats["budget_exhausted"] += 1
+            return False
+        _budget_used += 1
+        return True
+
+
+def reset_budget():
+    """重置重试预算和统计（新一次运行开始时调用）"""
+    global _budget_used
+    with _lock:
+        _budget_used = 0
+        for key in _stats:
+            _stats[key] = 0
+
+
+@contextmanager
+def deadline_scope(seconds):
+    """在当前线程内设置截止时间，超过截止时间的退避重试不再进行"""
+    previous = getattr(_state, "deadline", None)
+    deadline = time.monotonic() + seconds if seconds else None
+    if previous is not None and (deadline is None or previous < deadline):
+        deadline = previous
+    _state.deadline = deadline
+    try:
+        yield
+    finally:
+        _state.deadline = previous
+
+
+def remaining_time():
+    """当前线程截止时间前剩余的秒数，未设置截止时间时返回None"""
+    deadline = getattr(_state, "deadline", None)
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def is_retryable_status(status_code, idempotent=True):
+    return status_code in (RETRYABLE_STATUS if idempotent else NON_IDEMPOTENT_RETRYABLE_STATUS)
+
+
+def is_retryable_exception(exc, idempotent=True, retry_on=()):
+    """判断异常是否值得重试
+
+    连接超时或连接被拒绝说明请求未发出，总是可以重试；读取超时和连接中断时服务器可能已处理请求，只重试幂等请求。
+    """
+    if retry_on and isinstance(exc, retry_on):
+        return True
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(exc, requests.exceptions.ConnectionError) and exc.args:
+        if isinstance(getattr(exc.args[0], "reason", None), NewConnectionError):
+            return True
+    if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+        return is_retryable_status(exc.response.status_code, idempotent)
+    if isinstance(exc, (requests.exceptions.Timeout, requests.exceptions.ConnectionError,
+                        requests.exceptions.ChunkedEncodingError)):
+        return idempotent
+    return False
+
+
+def _retry_after(response):
+    """读取Retry-After响应头（秒数形式），没有时返回None"""
+    if response is None:
+        return None
+    value = getattr(response, "headers", {}).get("Retry-After")
+    try:
+        return max(float(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, response=None):
+    """第attempt次重试前的等待时间：指数退避加抖动，服务器给出Retry-After时优先使用"""
+    retry_after = _retry_after(response)
+    if retry_after is not None:
+        return min(retry_after, RETRY_MAX_DELAY)
+    delay = min(RETRY_DELAY * (2 ** attempt), RETRY_MAX_DELAY)
+    # 一半固定一半随机，避免多个源同时重试
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def call_with_retry(func, description="请求", retries=None, idempotent=True, retry_on=(),
+                    should_retry=None, logger=None):
+    """调用func()，遇到可重试的错误时退避重试
+
+    should_retry(result)返回True时也会重试（如返回了503响应），重试用尽后返回最后一次的结果；
+    不可重试的异常直接抛出，可重试的异常在重试用尽后抛出。
+    """
+    retries = RETRY_COUNT if retries is None else retries
+    attempt = 0
+    while True:
+        result = error = None
+        try:
+            result = func()
+        except Exception as e:
+            if attempt >= retries or not is_retryable_exception(e, idempotent, retry_on):
+                raise
+            error = e
+        else:
+            if attempt >= retries or not (should_retry and should_retry(result)):
+                return result
+
+        response = getattr(error, "response", None) if error is not None else result
+        reason = str(error) if error is not None else f"HTTP {getattr(result, 'status_code', '?')}"
+        delay = backoff_delay(attempt, response)
+        remaining = remaining_time()
+        if remaining is not None and delay >= remaining:
+            if logger: logger.warning(f"{description} 失败({reason})，剩余时间不足以重试")
+        elif not try_spend_budget():
+            if logger: logger.warning(f"{description} 失败({reason})，本次运行的重试预算已用完")
+        else:
+            if error is None and hasattr(result, "close"):
+                result.close()
+            with _lock:
+                _stats["retries"] += 1
+            attempt += 1
+            if logger: logger.warning(f"{description} 失败({reason})，{delay:.1f}秒后第{attempt}次重试")
+            time.sleep(delay)
+            continue
+
+        if error is not None:
+            raise error
+        return result
+
+
+def record_latency(key, seconds):
+    """记录一次成功请求的耗时，用于计算对冲阈值"""
+    with _lock:
+        samples = _latencies.get(key)
+        if samples is None:
+            samples = _latencies[key] = deque(maxlen=LATENCY_SAMPLES)
+        samples.append(seconds)
+
+
+def load_latencies():
+    """读取之前运行保存的主机延迟样本（新一次运行开始时调用）"""
+    persisted = source_state.get_namespace(LATENCY_NAMESPACE)
+    with _lock:
+        for key, samples in persisted.items():
+            current = _latencies.get(key, ())
+            _latencies[key] = deque(list(samples) + list(current), maxlen=LATENCY_SAMPLES)
+
+
+def save_latencies():
+    """保存各主机最近的延迟样本，供之后的运行计算对冲阈值"""
+    with _lock:
+        samples = {key: [round(value, 3) for value in values] for key, values in _latencies.items()}
+    if samples:
+        source_state.update_values(LATENCY_NAMESPACE, samples)
+
+
+def hedge_delay(key):
+    """返回该主机触发对冲请求的等待时间（历史延迟的HTTP_HEDGE_PERCENTILE分位数），样本不足时返回None"""
+    with _lock:
+        samples = sorted(_latencies.get(key, ()))
+    if len(samples) < HTTP_HEDGE_MIN_SAMPLES:
+        return None
+    index = min(int(len(samples) * HTTP_HEDGE_PERCENTILE / 100), len(samples) - 1)
+    return samples[index]
+
+
+def _get_hedge_executor():
+    global _hedge_executor
+    with _lock:
+        if _hedge_executor is None:
+            # 主请求和对冲请求都在此线程池中执行，容量需覆盖抓取引擎的并发数
+            _hedge_executor = concurrent.futures.ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedge")
+        return _hedge_executor
+
+
+def _discard(future):
+    """丢弃落后请求的结果，关闭其响应释放连接"""
+    def close(done):
+        try:
+            response = done.result()
+        except Exception:
+            return
+        if hasattr(response, "close"):
+            response.close()
+    future.add_done_callback(close)
+
+
+def hedged_call(func, delay):
+    """调用func()，超过delay秒未返回时再并行发起一次，返回先成功的结果
+
+    只能用于幂等请求；对冲请求计入重试预算，预算用完时不再对冲。
+    """
+    if delay is None:
+        return func()
+    executor = _get_hedge_executor()
+    primary = executor.submit(func)
+    try:
+        return primary.result(timeout=delay)
+    except concurrent.futures.TimeoutError:
+        pass
+    if not try_spend_budget():
+        return primary.result()
+
+    with _lock:
+        _stats["hedges"] += 1
+    hedge = executor.submit(func)
+    pending = {primary, hedge}
+    error = None
+    while pending:
+        done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            try:
+                result = future.result()
+            except Exception as e:
+                error = error or e
+                continue
+            for other in pending | (done - {future}):
+                _discard(other)
+            if future is hedge:
+                with _lock:
+                    _stats["hedge_wins"] += 1
+            return result
+    raise error
+
+
+def get_retry_stats():
+    """返回本次运行的重试统计"""
+    with _lock:
+        return dict(_stats, budget_used=_budget_used, budget=RETRY_BUDGET)
+
+
+def log_retry_stats(logger=None):
+    """输出重试与对冲统计"""
+    stats = get_retry_stats()
+    line = (f"重试统计: 重试 {stats['retries']} 次, 对冲请求 {stats['hedges']} 次(胜出 {stats['hedge_wins']} 次), "
+            f"预算 {stats['budget_used']}/{stats['budget']}, 因预算不足放弃 {stats['budget_exhausted']} 次")
+    if logger:
+        logger.info(line)
+    else:
+        print(line)
+    return stats
+
+
+def shutdown():
+    """关闭对冲请求线程池，不等待仍在进行的落后请求"""
+    global _hedge_executor
+    with _lock:
+        executor, _hedge_executor = _hedge_executor, None
+    if executor is not None:
+        executor.shutdown(wait=False)
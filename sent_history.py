@@ -0,0 +1,28 @@
+# 已发送记录
+# 成功推送到飞书的文章按规范链接记录发送时间（保存在source_state中），时间窗口过滤阶段据此判断
+# 没有发布时间的文章是否已经在之前的日报中发送过；超过SENT_HISTORY_DAYS天的记录在下次写入时清理。
+
+import time
+
+import source_state
+from config import SENT_HISTORY_DAYS
+from url_utils import is_article_link
+
+NAMESPACE = "sent_history"
+
+
+def was_sent(article):
+    """文章（按规范链接）是否已经发送过；链接不指向具体页面时无法判断，视为未发送"""
+    if not is_article_link(article.canonical_link):
+        return False
+    return source_state.get_value(NAMESPACE, article.canonical_link) is not None
+
+
+def record_sent(articles, logger=None):
+    """记录本次发送的文章，并清理过期记录"""
+    now = time.time()
+    expire_before = now - SENT_HISTORY_DAYS * 86400
+    source_state.update_values(NAMESPACE, {article.canonical_link: now for article in articles
+                                                if is_article_link(article.canonical_link)},
+                               keep=lambda sent_at: sent_at >= expire_before)
+    if logger: logger.info(f"已记录 {len(articles)} 条已发送文章")
@@ -0,0 +1,115 @@
+# 新闻站点地图读取
+# 以流式XML解析读取Google News站点地图(news:news)及站点地图索引，按lastmod只产出比上次更新的条目，
+# 解析过程中逐个清理元素，内存占用与站点地图大小无关。
+# 本次读到的新高水位先暂存，日报发送成功后才写入source_state，发送失败时下次运行仍会读到这些条目。
+
+import gzip
+import xml.etree.ElementTree as ET
+
+import http_client
+import source_state
+from date_parsing import parse_datetime
+
+# Google News站点地图扩展的命名空间，标题和发布时间只从该命名空间读取（image:title等同名元素不是文章标题）
+NEWS_NAMESPACE = "{http://www.google.com/schemas/sitemap-news/0.9}"
+NEWS_TITLE_TAG = NEWS_NAMESPACE + "title"
+NEWS_PUBLICATION_DATE_TAG = NEWS_NAMESPACE + "publication_date"
+
+_pending_watermarks = {}
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def open_stream(url, headers=None, timeout=None, logger=None):
+    """以流的方式打开站点地图，自动处理gzip压缩的.xml.gz文件"""
+    response = http_client.get(url, headers=headers, timeout=timeout, stream=True, logger=logger)
+    response.raise_for_status()
+    response.raw.decode_content = True
+    if url.lower().endswith(".gz"):
+        return response, gzip.GzipFile(fileobj=response.raw)
+    return response, response.raw
+
+
+def iter_entries(stream):
+    """流式解析站点地图，产出 ("sitemap", loc, lastmod, None) 或 ("url", loc, lastmod, title)"""
+    context = ET.iterparse(stream, events=("start", "end"))
+    _, root = next(context)
+    for event, element in context:
+        if event != "end":
+            continue
+        name = _local_name(element.tag)
+        if name not in ("url", "sitemap"):
+            continue
+
+        loc = lastmod = title = None
+        for child in element.iter():
+            text = (child.text or "").strip()
+            if not text:
+                continue
+            if child.tag == NEWS_PUBLICATION_DATE_TAG:
+                # news:publication_date比lastmod更接近真实发布时间
+                lastmod = text
+            elif child.tag == NEWS_TITLE_TAG:
+                if title is None:
+                    title = text
+            elif _local_name(child.tag) == "loc" and loc is None:
+                loc = text
+            elif _local_name(child.tag) == "lastmod" and lastmod is None:
+                lastmod = text
+
+        if loc:
+            yield name, loc, parse_datetime(lastmod), title
+        # 清理已处理的元素，保持内存平稳
+        element.clear()
+        root.clear()
+
+
+def get_watermark(source_name):
+    """读取该源已发送条目的lastmod高水位，没有时返回None"""
+    record = source_state.get_value("sitemap_watermark", source_name) or {}
+    return parse_datetime(record.get("lastmod"))
+
+
+def stage_watermark(source_name, lastmod):
+    """暂存本次读到的新高水位，等日报发送成功后由commit_watermarks写入"""
+    _pending_watermarks[source_name] = lastmod.isoformat()
+
+
+def commit_watermarks(logger=None):
+    """日报发送成功后写入暂存的高水位"""
+    for source_name, lastmod in list(_pending_watermarks.items()):
+        source_state.set_value("sitemap_watermark", source_name, {"lastmod": lastmod})
+        if logger: logger.info(f"{source_name} 站点地图高水位更新为 {lastmod}")
+    _pending_watermarks.clear()
+
+
+def read_new_entries(url, watermark=None, headers=None, timeout=None, max_children=20, logger=None):
+    """读取站点地图（含索引中的子站点地图），只产出lastmod晚于watermark的(loc, lastmod, title)"""
+    pending = [url]
+    visited = set()
+    while pending:
+        sitemap_url = pending.pop(0)
+        if sitemap_url in visited:
+            continue
+        visited.add(sitemap_url)
+        try:
+            response, stream = open_stream(sitemap_url, headers=headers, timeout=timeout, logger=logger)
+        except Exception as e:
+            if logger: logger.warning(f"读取站点地图失败 {sitemap_url}: {e}")
+            continue
+        try:
+            for kind, loc, lastmod, title in iter_entries(stream):
+                if kind == "sitemap":
+                    # 索引中的lastmod常常只精确到日期，按日期比较以免漏掉当天更新的子站点地图
+                    if watermark and lastmod and lastmod.date() < watermark.date():
+                        continue
+                    if len(visited) + len(pending) < max_children + 1:
+                        pending.append(loc)
+                elif not (watermark and lastmod and lastmod <= watermark):
+                    yield loc, lastmod, title
+        except ET.ParseError as e:
+            if logger: logger.warning(f"解析站点地图失败 {sitemap_url}: {e}")
+        finally:
+            response.close()
@@ -0,0 +1,172 @@
+# 新闻源健康度与熔断
+# 跨运行记录每个新闻源的抓取结果（是否成功、耗时、文章数），据此计算成功率、产出率和健康分。
+# 连续失败或长期没有产出文章的源打开熔断，冷却期内直接跳过，不再每次付出完整的超时代价；
+# 冷却结束后放行一次探测，探测得到文章则关闭熔断，否则加倍冷却时间。
+
+import threading
+import time
+
+import source_state
+from config import (CIRCUIT_BREAKER_ENABLED, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_COOLDOWN_HOURS,
+                    CIRCUIT_MAX_COOLDOWN_HOURS, HEALTH_HISTORY_SIZE, HEALTH_ZERO_YIELD_DAYS,
+                    ADAPTIVE_TIMEOUT_ENABLED, ADAPTIVE_TIMEOUT_PERCENTILE, ADAPTIVE_TIMEOUT_FACTOR,
+                    ADAPTIVE_TIMEOUT_MIN_SAMPLES, ADAPTIVE_TIMEOUT_FLOOR, ADAPTIVE_TIMEOUT_CEILING)
+
+NAMESPACE = "health"
+
+_lock = threading.Lock()
+# 本次运行中各源抓取函数内部捕获的错误（抓取函数出错时返回空列表而不抛出）
+_reported_errors = {}
+
+
+def _new_record(now):
+    return {
+        "history": [],
+        "consecutive_failures": 0,
+        "first_seen": now,
+        "last_yield_at": None,
+        "circuit": None,
+    }
+
+
+def get_record(source_name):
+    """返回源的健康记录，没有记录时返回None"""
+    return source_state.get_value(NAMESPACE, source_name)
+
+
+def _trip_reason(record, now):
+    """判断是否应打开熔断，返回原因或None"""
+    if record["consecutive_failures"] >= CIRCUIT_FAILURE_THRESHOLD:
+        return f"连续失败 {record['consecutive_failures']} 次"
+    last_yield = record.get("last_yield_at") or record.get("first_seen", now)
+    idle_days = (now - last_yield) / 86400
+    if idle_days >= HEALTH_ZERO_YIELD_DAYS:
+        return f"{idle_days:.0f} 天没有产出文章"
+    return None
+
+
+def should_skip(source_name, logger=None):
+    """熔断打开且仍在冷却期内时返回True；冷却结束后返回False，本次抓取即为探测"""
+    if not CIRCUIT_BREAKER_ENABLED:
+        return False
+    record = get_record(source_name)
+    circuit = record and record.get("circuit")
+    if not circuit:
+        return False
+    remaining = circuit["opened_at"] + circuit["cooldown_hours"] * 3600 - time.time()
+    if remaining > 0:
+        if logger: logger.info(f"{source_name} 熔断中({circuit['reason']})，跳过，{remaining / 3600:.1f} 小时后探测")
+        return True
+    if logger: logger.info(f"{source_name} 熔断冷却结束，本次抓取作为探测")
+    return False
+
+
+def report_error(source_name, error):
+    """抓取函数捕获异常后调用，使返回的空列表被记为失败而不是没有文章"""
+    with _lock:
+        _reported_errors[source_name] = error
+
+
+def record_result(source_name, article_count, elapsed, error=None, logger=None):
+    """记录一次抓取结果并更新熔断状态；error不为None表示抓取失败（含超时）"""
+    now = time.time()
+    with _lock:
+        reported = _reported_errors.pop(source_name, None)
+        if error is None and article_count == 0:
+            error = reported
+        success = error is None
+        record = get_record(source_name) or _new_record(now)
+        record["history"].append({
+            "at": round(now),
+            "ok": success,
+            "latency": round(elapsed, 2),
+            "articles": article_count,
+        })
+        record["history"] = record["history"][-HEALTH_HISTORY_SIZE:]
+        record["consecutive_failures"] = 0 if success else record["consecutive_failures"] + 1
+        if success and article_count > 0:
+            record["last_yield_at"] = now
+
+        circuit = record.get("circuit")
+        if circuit:
+            # 熔断期间能记录到结果说明本次是探测
+            if success and article_count > 0:
+                record["circuit"] = None
+                if logger: logger.info(f"{source_name} 探测成功，关闭熔断")
+            else:
+                cooldown = min(circuit["cooldown_hours"] * 2, CIRCUIT_MAX_COOLDOWN_HOURS)
+                record["circuit"] = dict(circuit, opened_at=now, cooldown_hours=cooldown)
+                if logger: logger.warning(f"{source_name} 探测失败，熔断冷却延长到 {cooldown} 小时")
+        elif CIRCUIT_BREAKER_ENABLED:
+            reason = _trip_reason(record, now)
+            if reason:
+                record["circuit"] = {"opened_at": now, "cooldown_hours": CIRCUIT_COOLDOWN_HOURS, "reason": reason}
+                if logger: logger.warning(f"{source_name} {reason}，打开熔断，{CIRCUIT_COOLDOWN_HOURS} 小时内跳过")
+
+        source_state.set_value(NAMESPACE, source_name, record)
+
+
+def _percentile(values, percentile):
+    values = sorted(values)
+    index = min(int(len(values) * percentile / 100), len(values) - 1)
+    return values[index]
+
+
+def adaptive_timeout(source_name, default=ADAPTIVE_TIMEOUT_CEILING):
+    """根据历史耗时推算该源的抓取截止时间（秒）
+
+    取最近成功抓取耗时的ADAPTIVE_TIMEOUT_PERCENTILE分位数乘以ADAPTIVE_TIMEOUT_FACTOR，
+    限制在[ADAPTIVE_TIMEOUT_FLOOR, ADAPTIVE_TIMEOUT_CEILING]之间；样本不足或上次抓取失败时返回default，
+    避免截止时间过紧导致连续超时、进而触发熔断。
+    """
+    if not ADAPTIVE_TIMEOUT_ENABLED:
+        return default
+    record = get_record(source_name)
+    history = record["history"] if record else []
+    if not history or not history[-1]["ok"]:
+        return default
+    latencies = [item["latency"] for item in history if item["ok"]]
+    if len(latencies) < ADAPTIVE_TIMEOUT_MIN_SAMPLES:
+        return default
+    timeout = _percentile(latencies, ADAPTIVE_TIMEOUT_PERCENTILE) * ADAPTIVE_TIMEOUT_FACTOR
+    return min(max(timeout, ADAPTIVE_TIMEOUT_FLOOR), ADAPTIVE_TIMEOUT_CEILING)
+
+
+def get_health(source_name):
+    """汇总源的健康指标: 成功率、产出率(有文章的次数占比)、平均文章数、耗时中位数和0-100的健康分"""
+    record = get_record(source_name)
+    history = record["history"] if record else []
+    if not history:
+        return None
+    runs = len(history)
+    success_rate = sum(1 for item in history if item["ok"]) / runs
+    yield_rate = sum(1 for item in history if item["articles"] > 0) / runs
+    latencies = [item["latency"] for item in history if item["ok"]]
+    return {
+        "runs": runs,
+        "success_rate": success_rate,
+        "yield_rate": yield_rate,
+        "avg_articles": sum(item["articles"] for item in history) / runs,
+        "median_latency": _percentile(latencies, 50) if latencies else None,
+        "score": round(100 * success_rate * (0.5 + 0.5 * yield_rate)),
+        "circuit_open": bool(record.get("circuit")),
+    }
+
+
+def log_health_report(source_names, logger=None):
+    """输出各源的健康度报告"""
+    lines = ["新闻源健康度:"]
+    for source_name in source_names:
+        health = get_health(source_name)
+        if not health:
+            continue
+        latency = f"{health['median_latency']:.1f}秒" if health["median_latency"] is not None else "-"
+        status = " [熔断]" if health["circuit_open"] else ""
+        lines.append(f"   {source_name}: 健康分 {health['score']}, 成功率 {health['success_rate']:.0%}, "
+                     f"产出率 {health['yield_rate']:.0%}, 平均 {health['avg_articles']:.1f} 条, "
+                     f"耗时中位数 {latency} (最近 {health['runs']} 次){status}")
+    for line in lines:
+        if logger:
+            logger.info(line)
+        else:
+            print(line)
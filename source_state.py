@@ -0,0 +1,74 @@
+# 新闻源状态存储
+# 在磁盘JSON文件中按命名空间保存跨运行的新闻源状态（如抓取层级），线程安全，原子写入。
+
+import copy
+import json
+import os
+import threading
+
+from config import SOURCE_STATE_FILE
+
+_lock = threading.RLock()
+_state = None
+
+
+def _load():
+    global _state
+    if _state is None:
+        try:
+            with open(SOURCE_STATE_FILE, "r", encoding="utf-8") as f:
+                _state = json.load(f)
+        except (OSError, ValueError):
+            _state = {}
+    return _state
+
+
+def _save():
+    directory = os.path.dirname(SOURCE_STATE_FILE)
+    try:
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{SOURCE_STATE_FILE}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, SOURCE_STATE_FILE)
+    except OSError:
+        pass
+
+
+def get_value(namespace, key, default=None):
+    """读取命名空间namespace下key的状态，返回副本"""
+    with _lock:
+        value = _load().get(namespace, {}).get(key, default)
+        return copy.deepcopy(value)
+
+
+def get_namespace(namespace):
+    """读取命名空间下的全部状态，返回副本"""
+    with _lock:
+        return copy.deepcopy(_load().get(namespace, {}))
+
+
+def set_value(namespace, key, value):
+    """写入状态并立即保存到磁盘"""
+    with _lock:
+        _load().setdefault(namespace, {})[key] = value
+        _save()
+
+
+def delete_value(namespace, key):
+    """删除状态"""
+    with _lock:
+        if _load().get(namespace, {}).pop(key, None) is not None:
+            _save()
+
+
+def update_values(namespace, values, keep=None):
+    """批量写入状态并只保存一次；指定keep时先删除该命名空间下keep(value)为False的旧状态"""
+    with _lock:
+        entries = _load().setdefault(namespace, {})
+        if keep is not None:
+            for key in [key for key, value in entries.items() if not keep(value)]:
+                del entries[key]
+        entries.update(values)
+        _save()
@@ -0,0 +1,17 @@
+# 各模块位于仓库根目录，测试时加入导入路径
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture
+def state_file(tmp_path, monkeypatch):
+    """让source_state读写临时文件，测试之间互不影响"""
+    import source_state
+    path = tmp_path / "source_state.json"
+    monkeypatch.setattr(source_state, "SOURCE_STATE_FILE", str(path))
+    monkeypatch.setattr(source_state, "_state", None)
+    return path
@@ -0,0 +1,53 @@
+# Article的缓存序列化（to_row/from_row）往返一致
+
+import json
+from datetime import datetime, timedelta, timezone
+
+from article import Article
+from date_parsing import is_date_only, parse_datetime
+
+
+def round_trip(article):
+    # 缓存以JSON保存
+    return Article.from_row(json.loads(json.dumps(article.to_row(), ensure_ascii=False)))
+
+
+def test_row_without_published():
+    article = Article(" 标题 AI ", "https://example.com/p/1?utm_source=x", "36氪", date="06月10日")
+    assert article.to_row() == ["标题 AI", "https://example.com/p/1?utm_source=x", "36氪", "06月10日", None]
+    restored = round_trip(article)
+    assert (restored.title, restored.link, restored.source, restored.date) == ("标题 AI", article.link, "36氪", "06月10日")
+    assert restored.published is None
+    assert (restored.canonical_link, restored.title_key) == (article.canonical_link, article.title_key)
+
+
+def test_row_with_date_only_published():
+    article = Article("只有日期的文章", "https://example.com/p/2", "机器之心", published=parse_datetime("2025-06-10"))
+    # 只保存日期，恢复后仍是日期精度
+    assert article.to_row()[3:] == ["06月10日", "2025-06-10"]
+    restored = round_trip(article)
+    assert restored.published == article.published
+    assert is_date_only(restored.published)
+    assert restored.date == "06月10日"
+
+
+def test_row_with_offset_datetime():
+    published = datetime(2025, 6, 10, 23, 30, tzinfo=timezone(timedelta(hours=-5)))
+    article = Article("带时区偏移的文章", "https://example.com/p/3", "TechCrunch", published=published)
+    # 显示日期按本地时区（次日），保存的时间保留原偏移
+    assert article.to_row()[3:] == ["06月11日", "2025-06-10T23:30:00-05:00"]
+    restored = round_trip(article)
+    assert restored.published == published
+    assert restored.published.utcoffset() == timedelta(hours=-5)
+    assert not is_date_only(restored.published)
+    assert restored.date == "06月11日"
+
+
+def test_legacy_dict_rows():
+    article = Article.from_row({"title": "旧版缓存标题", "link": "https://example.com/a", "date": "06月10日"})
+    assert (article.title, article.link, article.source, article.date) == ("旧版缓存标题", "https://example.com/a", "", "06月10日")
+    assert article.published is None
+
+
+def test_articles_have_no_instance_dict():
+    assert not hasattr(Article("t", "https://example.com/a", "s"), "__dict__")
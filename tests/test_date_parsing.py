@@ -0,0 +1,121 @@
+# 发布时间解析：相对时间、没有年份的日期、RFC 822和ISO 8601
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import date_parsing
+from date_parsing import LOCAL_TIMEZONE, is_date_only, parse_datetime
+
+REFERENCE = datetime(2026, 10, 18, 9, 30, tzinfo=LOCAL_TIMEZONE)
+
+
+@pytest.fixture(autouse=True)
+def fixed_now(monkeypatch):
+    monkeypatch.setattr(date_parsing, "now", lambda: REFERENCE)
+
+
+def local(*args):
+    return datetime(*args, tzinfo=LOCAL_TIMEZONE)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("刚刚", REFERENCE),
+    ("30秒前", REFERENCE - timedelta(seconds=30)),
+    ("5分钟前", REFERENCE - timedelta(minutes=5)),
+    ("3小时前", REFERENCE - timedelta(hours=3)),
+    ("2天前", REFERENCE - timedelta(days=2)),
+    ("1周前", REFERENCE - timedelta(weeks=1)),
+    ("2 hours ago", REFERENCE - timedelta(hours=2)),
+    ("3 days ago", REFERENCE - timedelta(days=3)),
+    ("昨天 10:30", local(2026, 10, 17, 10, 30)),
+    ("yesterday 23:05", local(2026, 10, 17, 23, 5)),
+])
+def test_relative_times(text, expected):
+    result = parse_datetime(text)
+    assert result == expected
+    assert not is_date_only(result)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("今天", local(2026, 10, 18)),
+    ("昨天", local(2026, 10, 17)),
+    ("前天", local(2026, 10, 16)),
+])
+def test_day_words_without_time_are_date_only(text, expected):
+    result = parse_datetime(text)
+    assert result == expected
+    assert is_date_only(result)
+
+
+@pytest.mark.parametrize("text, expected, date_only", [
+    ("10月17日", local(2026, 10, 17), True),
+    ("10月19日", local(2026, 10, 19), True),
+    # 晚于参考时间一天以上的日期属于去年
+    ("12月31日", local(2025, 12, 31), True),
+    ("发布于 6月10日 08:15", local(2026, 6, 10, 8, 15), False),
+    ("06-10 10:30", local(2026, 6, 10, 10, 30), False),
+    ("11-02", local(2025, 11, 2), True),
+    ("2025年6月10日", local(2025, 6, 10), True),
+    ("2025年6月10日 10:30", local(2025, 6, 10, 10, 30), False),
+])
+def test_month_day_without_year(text, expected, date_only):
+    result = parse_datetime(text)
+    assert result == expected
+    assert is_date_only(result) is date_only
+
+
+@pytest.mark.parametrize("reference, expected", [
+    # 非闰年：取最近的不在未来的闰年
+    (local(2026, 10, 18), local(2024, 2, 29)),
+    (local(2025, 1, 5), local(2024, 2, 29)),
+    # 闰年里2月29日还没到：取上一个闰年
+    (local(2024, 1, 10), local(2020, 2, 29)),
+    (local(2024, 2, 28, 12), local(2024, 2, 29)),
+    (local(2024, 3, 1), local(2024, 2, 29)),
+])
+def test_february_29_without_year(monkeypatch, reference, expected):
+    monkeypatch.setattr(date_parsing, "now", lambda: reference)
+    assert parse_datetime("2月29日") == expected
+    assert parse_datetime("02-29 10:00") == expected.replace(hour=10)
+
+
+@pytest.mark.parametrize("text", ["2月30日", "13-01", "2025年2月29日", "2025-02-30", "不是日期"])
+def test_invalid_dates(text):
+    assert parse_datetime(text) is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Tue, 10 Jun 2025 08:00:00 GMT", datetime(2025, 6, 10, 8, 0, tzinfo=timezone.utc)),
+    ("Tue, 10 Jun 2025 16:00:00 +0800", datetime(2025, 6, 10, 8, 0, tzinfo=timezone.utc)),
+    ("10 Jun 2025 08:00:00 -0500", datetime(2025, 6, 10, 13, 0, tzinfo=timezone.utc)),
+])
+def test_rfc_822(text, expected):
+    result = parse_datetime(text)
+    assert result == expected and result.tzinfo is not None
+
+
+@pytest.mark.parametrize("text, expected, date_only", [
+    ("2025-06-10T08:00:00Z", datetime(2025, 6, 10, 8, 0, tzinfo=timezone.utc), False),
+    ("2025-06-10T08:00:00+02:00", datetime(2025, 6, 10, 6, 0, tzinfo=timezone.utc), False),
+    # 没有时区按NEWS_TIMEZONE
+    ("2025-06-10 08:00:00", local(2025, 6, 10, 8, 0), False),
+    ("2025-06-10", local(2025, 6, 10), True),
+    ("2025/6/10", local(2025, 6, 10), True),
+    ("2025/06/10 08:00", local(2025, 6, 10, 8, 0), False),
+])
+def test_iso_and_slash_dates(text, expected, date_only):
+    result = parse_datetime(text)
+    assert result == expected
+    assert is_date_only(result) is date_only
+
+
+def test_non_string_values():
+    expected = datetime(2025, 6, 10, 8, 0, tzinfo=timezone.utc)
+    assert parse_datetime(expected.timestamp()) == expected
+    assert parse_datetime(int(expected.timestamp() * 1000)) == expected
+    assert parse_datetime(str(int(expected.timestamp()))) == expected
+    assert parse_datetime(time.struct_time((2025, 6, 10, 8, 0, 0, 1, 161, 0))) == expected
+    assert parse_datetime(datetime(2025, 6, 10, 8, 0)) == local(2025, 6, 10, 8, 0)
+    assert parse_datetime(None) is None and parse_datetime("  ") is None
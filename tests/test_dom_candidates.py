@@ -0,0 +1,142 @@
+# 机器之心DOM回退匹配的各层、链接来源和父元素日期查找，以及DomIndex的查表结果
+
+import re
+
+from bs4 import BeautifulSoup
+
+from date_parsing import is_date_only
+from dom_candidates import DomIndex, cascade, class_matches, has_class
+from main import parse_jiqizhixin_dom
+
+
+def page(*items):
+    return f"<html><body><div class='home__left-body'>{''.join(items)}</div></body></html>"
+
+
+def parse(html):
+    return [(article.title, article.link) for article in parse_jiqizhixin_dom(html, "机器之心")]
+
+
+def test_body_title_tier_wins_when_it_has_enough_items():
+    html = page(
+        *(f"<div><a class='body-title' href='/articles/{i}'>大模型推理优化第{i}篇</a></div>" for i in range(5)),
+        "<div><a class='title' href='/articles/other'>普通标题不应被选中</a></div>",
+    )
+    assert parse(html) == [(f"大模型推理优化第{i}篇", f"https://www.jiqizhixin.com/articles/{i}") for i in range(5)]
+
+
+def test_item_class_tier():
+    html = page(
+        *(f"<li><a class='{name}' href='/a/{name}'>{name}的文章标题</a></li>"
+          for name in ("article-item", "news-item", "post-title", "title", "article-item")),
+        "<a class='nav' href='/a/nav'>导航链接不是文章</a>",
+    )
+    assert [title for title, _ in parse(html)] == [
+        "article-item的文章标题", "news-item的文章标题", "post-title的文章标题", "title的文章标题", "article-item的文章标题",
+    ]
+
+
+def test_href_pattern_tier():
+    html = page(
+        *(f"<a href='/{path}/{i}'>按链接地址匹配的文章{i}</a>"
+          for i, path in enumerate(["articles", "news", "post", "reference", "articles"])),
+        "<a href='/about'>关于我们的介绍页面</a>",
+    )
+    assert [link for _, link in parse(html)] == [
+        "https://www.jiqizhixin.com/articles/0", "https://www.jiqizhixin.com/news/1",
+        "https://www.jiqizhixin.com/post/2", "https://www.jiqizhixin.com/reference/3",
+        "https://www.jiqizhixin.com/articles/4",
+    ]
+
+
+def test_ai_link_tier_needs_href_long_text_and_keyword():
+    html = page(
+        "<a href='/p/1'>机器学习在医疗影像中的新应用</a>",
+        "<a href='/p/2'>人工智能芯片出货量创下新高</a>",
+        "<a href='/p/3'>机器人</a>",
+        "<a href='/p/4'>今天的天气非常好适合出门散步</a>",
+        "<a>没有链接的人工智能相关文字内容</a>",
+    )
+    assert [link for _, link in parse(html)] == ["https://www.jiqizhixin.com/p/1", "https://www.jiqizhixin.com/p/2"]
+
+
+def test_links_from_onclick_and_data_href():
+    html = page(
+        "<a class='body-title' onclick=\"window.open('https://www.jiqizhixin.com/articles/abs')\">绝对地址的onclick</a>",
+        "<a class='body-title' onclick=\"go('/articles/rel')\">相对地址的onclick</a>",
+        "<a class='body-title' data-href='/articles/data'>只有data-href的链接</a>",
+        "<a class='body-title' href='#' data-href='/articles/anchor'>href只是锚点的链接</a>",
+        "<a class='body-title' onclick='track()'>无法得到链接的条目</a>",
+    )
+    assert parse(html) == [
+        ("绝对地址的onclick", "https://www.jiqizhixin.com/articles/abs"),
+        ("相对地址的onclick", "https://www.jiqizhixin.com/articles/rel"),
+        ("只有data-href的链接", "https://www.jiqizhixin.com/articles/data"),
+        ("href只是锚点的链接", "https://www.jiqizhixin.com/articles/anchor"),
+    ]
+
+
+def test_short_titles_are_skipped():
+    # 不足5条时会继续看后续层，这里的地址不匹配后续层，避免重复
+    html = page("<a class='body-title' href='/a/1'>短标题</a>",
+                "<a class='body-title' href='/a/2'>足够长的标题</a>")
+    assert parse(html) == [("足够长的标题", "https://www.jiqizhixin.com/a/2")]
+
+
+def test_date_is_looked_up_in_parent_only():
+    html = page(
+        "<div class='item'><a class='body-title' href='/a/1'>带日期的文章标题</a><span>10月17日</span></div>",
+        "<section><span>10月16日</span><div><a class='body-title' href='/a/2'>日期在祖父元素的标题</a></div></section>",
+        "<div><a class='body-title' href='/a/3'>没有日期的文章标题</a></div>",
+    )
+    dated, grandparent, undated = parse_jiqizhixin_dom(html, "机器之心")
+    assert (dated.published.month, dated.published.day) == (10, 17)
+    assert is_date_only(dated.published)
+    assert grandparent.published is None
+    assert undated.published is None
+
+
+def test_index_lookups_on_fixture():
+    soup = BeautifulSoup(
+        "<div id='outer'>"
+        "<span class='pub-date'>发布于</span>"
+        "<div id='inner'><p>6月10日 10:00</p><time>2024-06-10</time><a href='/x'>链接</a></div>"
+        "</div>"
+        "<div id='empty'>没有内容</div>",
+        "html.parser",
+    )
+    index = DomIndex(soup)
+    outer, inner, empty = (soup.find(id=name) for name in ("outer", "inner", "empty"))
+
+    assert index.containers == [outer, inner, empty]
+    assert index.anchors == [soup.a]
+    assert index.first_anchor(outer) is soup.a and index.first_anchor(empty) is None
+    # <time>优先于更早出现的span.pub-date
+    assert index.first_time_element(outer) is soup.time
+    assert index.first_time_element(empty) is None
+    assert index.first_date(outer) == index.first_date(inner) == "6月10日"
+    assert index.first_date(empty) is None
+    assert index.text(inner) == "6月10日 10:002024-06-10链接"
+
+
+def test_class_helpers():
+    soup = BeautifulSoup("<span class='item time'></span><span class='x'></span><a class='title big'></a>", "html.parser")
+    first, second, anchor = soup.find_all(True)
+    assert has_class(anchor, ("title",)) and not has_class(second, ("title",))
+    assert class_matches(first, re.compile(r"time|date"))
+    # 与find_all一致：多个class时也匹配完整的class字符串
+    assert class_matches(first, re.compile(r"item time"))
+    assert not class_matches(second, re.compile(r"time|date"))
+
+
+def test_cascade_stops_once_minimum_reached():
+    consumed = []
+
+    def tier(name, count):
+        for index in range(count):
+            consumed.append(name)
+            yield f"{name}{index}"
+
+    items = cascade([tier("a", 3), tier("b", 3), tier("c", 3)], minimum=5)
+    assert items == ["a0", "a1", "a2", "b0", "b1", "b2"]
+    assert "c" not in consumed
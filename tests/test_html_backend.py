@@ -0,0 +1,72 @@
+# 只构建标题链接的SoupStrainer：针对被丢弃的元素，检查解析结果与完整解析一致
+
+import pytest
+
+from html_backend import BACKENDS, LXML_AVAILABLE, anchors_with_class, forced_backend, make_soup
+from main import parse_infoq_html
+
+TITLE_CLASSES = ["news-title", "article-title", "title"]
+
+AVAILABLE_BACKENDS = [b for b in BACKENDS if b != "lxml" or LXML_AVAILABLE]
+
+
+def title_anchors(soup):
+    return [(a.get_text(strip=True), a.get("href")) for a in soup.find_all("a", class_=TITLE_CLASSES)]
+
+
+def both_soups(html, backend):
+    with forced_backend(backend):
+        return make_soup(html), make_soup(html, parse_only=anchors_with_class(TITLE_CLASSES))
+
+
+@pytest.mark.parametrize("backend", AVAILABLE_BACKENDS)
+def test_anchors_outside_item_containers(backend):
+    html = """<html><body>
+        <a class="title" href="/p/top">页面顶部的AI标题</a>
+        <ul class="list"><li class="item"><div><a class="news-title" href="/p/1">容器内的大模型新闻</a></div></li></ul>
+        <footer><a class="article-title" href="/p/foot">页脚里的深度学习文章</a><a href="/about">关于</a></footer>
+    </body></html>"""
+    full, restricted = both_soups(html, backend)
+    assert title_anchors(restricted) == title_anchors(full) == [
+        ("页面顶部的AI标题", "/p/top"), ("容器内的大模型新闻", "/p/1"), ("页脚里的深度学习文章", "/p/foot"),
+    ]
+    # 容器和无关链接不构建
+    assert restricted.find("li") is None and restricted.find("a", href="/about") is None
+
+
+@pytest.mark.parametrize("backend", AVAILABLE_BACKENDS)
+def test_date_nodes_next_to_links(backend):
+    html = """<div class="item">
+        <span class="time">6月10日</span><a class="title" href="/p/1">OpenAI发布新模型<em>6月11日</em></a>
+        <span class="date">6月12日</span>
+    </div>"""
+    full, restricted = both_soups(html, backend)
+    assert title_anchors(restricted) == title_anchors(full) == [("OpenAI发布新模型6月11日", "/p/1")]
+    # 链接内部的日期保留，链接旁边的日期节点被丢弃，所以使用限制解析的函数不能到父元素中找日期
+    assert restricted.a.em.get_text() == "6月11日"
+    assert restricted.find("span") is None
+    assert full.find("span", class_="time").get_text() == "6月10日"
+
+
+@pytest.mark.parametrize("backend", AVAILABLE_BACKENDS)
+def test_anchor_with_only_onclick(backend):
+    html = """<div>
+        <a class="title" onclick="window.open('/p/1')">只有onclick的AI标题</a>
+        <a onclick="window.open('/p/2')">没有class的onclick链接</a>
+        <a class="title" href="/p/3">有href的AI大模型标题</a>
+    </div>"""
+    full, restricted = both_soups(html, backend)
+    assert title_anchors(restricted) == title_anchors(full) == [
+        ("只有onclick的AI标题", None), ("有href的AI大模型标题", "/p/3"),
+    ]
+    assert restricted.find("a", class_="title")["onclick"] == "window.open('/p/1')"
+    # 解析函数跳过没有href的链接
+    with forced_backend(backend):
+        articles = parse_infoq_html(html, "InfoQ")
+    assert [(a.title, a.link) for a in articles] == [("有href的AI大模型标题", "https://www.infoq.cn/p/3")]
+
+
+def test_strainer_splits_multi_class_attribute():
+    html = '<a class="time title" href="/p/1">多个class的标题</a><a class="titles" href="/p/2">不匹配</a>'
+    soup = make_soup(html, parse_only=anchors_with_class(TITLE_CLASSES))
+    assert title_anchors(soup) == [("多个class的标题", "/p/1")]
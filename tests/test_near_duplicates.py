@@ -0,0 +1,48 @@
+# 近似重复检测：已知的同一事件改写和不同事件标题
+
+import pytest
+
+from near_duplicates import NearDuplicateIndex, entities, minhash, shingles
+
+SAME_EVENT = [
+    ("OpenAI发布GPT-5，性能大幅提升", "OpenAI正式发布GPT-5：性能大幅提升"),
+    ("英伟达发布新一代AI芯片Blackwell", "英伟达正式发布新一代AI芯片 Blackwell"),
+    ("Anthropic releases Claude 4 with better coding", "Anthropic releases Claude 4, with improved coding"),
+    ("Meta以10亿美元收购AI初创公司Scale", "Meta斥资10亿美元收购AI初创公司Scale"),
+    ("谷歌发布Gemini 2.5 Pro模型", "谷歌正式推出Gemini 2.5 Pro模型"),
+    ("OpenAI launches GPT-5 to all ChatGPT users", "OpenAI rolls out GPT-5 to all ChatGPT users"),
+    ("ＯｐｅｎＡＩ发布ＧＰＴ－５", "OpenAI发布GPT-5"),
+]
+
+DIFFERENT_EVENTS = [
+    ("英伟达发布新一代AI芯片，性能提升30%", "AMD发布新一代AI芯片，性能提升30%"),
+    ("谷歌发布Gemini 2.5 Pro模型", "谷歌发布Gemini 2.5 Flash模型"),
+    ("Meta以10亿美元收购AI初创公司", "Meta以20亿美元收购AI初创公司"),
+    ("OpenAI releases GPT-5 for enterprise customers", "OpenAI releases GPT-4o for enterprise customers"),
+    ("百度发布文心大模型4.5", "百度发布文心大模型5.0"),
+    ("Anthropic raises $2B in new funding round", "Mistral raises $2B in new funding round"),
+    ("微软发布新版Copilot助手", "特斯拉公布人形机器人量产计划"),
+]
+
+
+def find_after_add(first, second):
+    index = NearDuplicateIndex()
+    features = shingles(first)
+    index.add(first, features, minhash(features), entities(first))
+    features = shingles(second)
+    return index.find(features, minhash(features), entities(second))
+
+
+@pytest.mark.parametrize("first, second", SAME_EVENT)
+def test_rewrites_of_same_event_are_merged(first, second):
+    assert find_after_add(first, second) == first
+
+
+@pytest.mark.parametrize("first, second", DIFFERENT_EVENTS)
+def test_different_events_are_kept_apart(first, second):
+    assert find_after_add(first, second) is None
+
+
+def test_entities_are_names_and_numbers():
+    assert entities("Google launches Gemini 2.5 Pro for developers") == {"google", "gemini", "2", "5", "pro"}
+    assert entities("英伟达发布新一代AI芯片") == {"ai"}
@@ -0,0 +1,155 @@
+# 重试分类、重试预算和对冲请求
+
+import threading
+import time
+
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+import http_client
+import retry_policy
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    """按顺序返回预设的响应或抛出预设的异常，并记录请求次数"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(outcome)
+
+
+@pytest.fixture(autouse=True)
+def fresh_run(monkeypatch):
+    # 不等待退避，不启用对冲，每个测试使用完整的预算
+    monkeypatch.setattr(retry_policy, "backoff_delay", lambda attempt, response=None: 0)
+    monkeypatch.setattr(http_client, "HTTP_HEDGE_ENABLED", False)
+    retry_policy.reset_budget()
+
+
+def send(monkeypatch, method, *outcomes, retries=3):
+    session = FakeSession(*outcomes)
+    monkeypatch.setattr(http_client, "get_session", lambda url: session)
+    try:
+        result = http_client.request(method, "https://example.com/hook", retries=retries)
+    except Exception as e:
+        result = e
+    return session.calls, result
+
+
+def connect_error():
+    # requests把urllib3的MaxRetryError(reason=NewConnectionError)包装成ConnectionError
+    reason = NewConnectionError(None, "connection refused")
+    return requests.exceptions.ConnectionError(MaxRetryError(None, "https://example.com/hook", reason))
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+def test_get_retries_transient_status(monkeypatch, status):
+    calls, response = send(monkeypatch, "GET", status, 200)
+    assert (calls, response.status_code) == (2, 200)
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_post_retries_when_server_did_not_process(monkeypatch, status):
+    calls, response = send(monkeypatch, "POST", status, 200)
+    assert (calls, response.status_code) == (2, 200)
+
+
+@pytest.mark.parametrize("status", [500, 502, 504])
+def test_post_is_not_retried_after_gateway_errors(monkeypatch, status):
+    calls, response = send(monkeypatch, "POST", status, 200)
+    assert (calls, response.status_code) == (1, status)
+
+
+def test_post_retries_connect_failures_only(monkeypatch):
+    calls, response = send(monkeypatch, "POST", requests.exceptions.ConnectTimeout(), 200)
+    assert (calls, response.status_code) == (2, 200)
+    calls, response = send(monkeypatch, "POST", connect_error(), 200)
+    assert (calls, response.status_code) == (2, 200)
+    # 读取超时时服务器可能已处理请求
+    calls, error = send(monkeypatch, "POST", requests.exceptions.ReadTimeout(), 200)
+    assert calls == 1 and isinstance(error, requests.exceptions.ReadTimeout)
+
+
+def test_client_errors_are_not_retried(monkeypatch):
+    calls, response = send(monkeypatch, "GET", 404, 200)
+    assert (calls, response.status_code) == (1, 404)
+
+
+def test_retries_stop_after_retry_count(monkeypatch):
+    calls, response = send(monkeypatch, "GET", 503, retries=2)
+    assert (calls, response.status_code) == (3, 503)
+
+
+def test_budget_is_shared_and_reset_per_run(monkeypatch):
+    monkeypatch.setattr(retry_policy, "RETRY_BUDGET", 2)
+    retry_policy.reset_budget()
+    assert retry_policy.try_spend_budget() and retry_policy.try_spend_budget()
+    assert not retry_policy.try_spend_budget()
+    # 预算用完后不再重试
+    calls, response = send(monkeypatch, "GET", 503, 200)
+    assert (calls, response.status_code) == (1, 503)
+    assert retry_policy.get_retry_stats()["budget_exhausted"] == 2
+
+    retry_policy.reset_budget()
+    assert retry_policy.try_spend_budget()
+
+
+def test_hedged_call_returns_faster_duplicate():
+    release = threading.Event()
+    calls = []
+
+    def func():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            # 主请求卡住，直到测试结束
+            release.wait(2)
+            return "primary"
+        return "hedge"
+
+    try:
+        assert retry_policy.hedged_call(func, 0.05) == "hedge"
+    finally:
+        release.set()
+    stats = retry_policy.get_retry_stats()
+    assert (stats["hedges"], stats["hedge_wins"], stats["budget_used"]) == (1, 1, 1)
+
+
+def test_hedged_call_without_delay_or_budget_sends_once(monkeypatch):
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return "only"
+
+    assert retry_policy.hedged_call(slow, None) == "only"
+    monkeypatch.setattr(retry_policy, "RETRY_BUDGET", 0)
+    assert retry_policy.hedged_call(slow, 0.01) == "only"
+    assert len(calls) == 2 and retry_policy.get_retry_stats()["hedges"] == 0
+
+
+def test_hedge_delay_needs_enough_samples(monkeypatch):
+    monkeypatch.setattr(retry_policy, "_latencies", {})
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        retry_policy.record_latency("https://example.com", seconds)
+    assert retry_policy.hedge_delay("https://example.com") is None
+    retry_policy.record_latency("https://example.com", 0.5)
+    assert retry_policy.hedge_delay("https://example.com") == 0.5
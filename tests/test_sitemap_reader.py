@@ -0,0 +1,71 @@
+# 新闻站点地图：命名空间匹配、按lastmod选取最新条目、高水位在发送成功后才写入
+
+import io
+from datetime import datetime, timedelta, timezone
+
+import sitemap_reader
+
+SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:news="http://www.google.com/schemas/sitemap-news/0.9"
+        xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">
+  <url>
+    <loc>https://example.com/a</loc>
+    <lastmod>2025-06-09T00:00:00Z</lastmod>
+    <news:news>
+      <news:publication><news:name>Example</news:name></news:publication>
+      <news:publication_date>2025-06-10T08:00:00Z</news:publication_date>
+      <news:title>OpenAI ships new AI model</news:title>
+    </news:news>
+    <image:image>
+      <image:loc>https://example.com/a.jpg</image:loc>
+      <image:title>Photo of Sam Altman on stage</image:title>
+    </image:image>
+  </url>
+  <url>
+    <loc>https://example.com/b</loc>
+    <lastmod>2025-06-09</lastmod>
+    <news:news><news:title/></news:news>
+  </url>
+</urlset>"""
+
+
+def test_news_title_and_publication_date_use_news_namespace():
+    entries = list(sitemap_reader.iter_entries(io.BytesIO(SITEMAP)))
+    assert entries[0] == ("url", "https://example.com/a", datetime(2025, 6, 10, 8, tzinfo=timezone.utc),
+                          "OpenAI ships new AI model")
+    # 空的news:title不报错，lastmod作为时间
+    kind, loc, lastmod, title = entries[1]
+    assert (kind, loc, title, lastmod.date().isoformat()) == ("url", "https://example.com/b", None, "2025-06-09")
+
+
+def test_watermark_is_written_only_on_commit(state_file):
+    lastmod = datetime(2025, 6, 10, 8, tzinfo=timezone.utc)
+    sitemap_reader.stage_watermark("Example Sitemap", lastmod)
+    assert sitemap_reader.get_watermark("Example Sitemap") is None
+
+    sitemap_reader.commit_watermarks()
+    assert sitemap_reader.get_watermark("Example Sitemap") == lastmod
+    # 已写入的高水位不会被再次提交
+    sitemap_reader.commit_watermarks()
+    assert sitemap_reader.get_watermark("Example Sitemap") == lastmod
+
+
+def test_sitemap_news_keeps_newest_entries_and_their_watermark(state_file, monkeypatch):
+    import main
+
+    base = datetime(2025, 6, 10, tzinfo=timezone.utc)
+    # 站点地图条目不按时间排序
+    hours = [3, 9, 1, 7, 5, 8, 2, 6, 4]
+    entries = [(f"https://example.com/{hour}", base + timedelta(hours=hour), f"AI news number {hour}") for hour in hours]
+    entries.append(("https://example.com/other", base + timedelta(hours=10), "Sports results of the day"))
+    monkeypatch.setattr(sitemap_reader, "read_new_entries", lambda *args, **kwargs: iter(entries))
+    monkeypatch.setattr(main, "MAX_ARTICLES_PER_SOURCE", 3)
+
+    articles = main.get_sitemap_news("https://example.com/sitemap.xml", "Example Sitemap")
+
+    assert [article.link for article in articles] == ["https://example.com/9", "https://example.com/8",
+                                                      "https://example.com/7"]
+    sitemap_reader.commit_watermarks()
+    # 高水位是返回的条目中最新的，而不是非AI条目或未返回条目的时间
+    assert sitemap_reader.get_watermark("Example Sitemap") == base + timedelta(hours=9)
@@ -0,0 +1,73 @@
+# 链接解析（resolve_link）与去重用的规范链接（canonical_url）
+
+import pytest
+
+from url_utils import canonical_url, is_article_link, resolve_link
+
+BASE = "https://www.infoq.cn/topic/AI"
+
+
+@pytest.mark.parametrize("href, expected", [
+    ("/article/abc", "https://www.infoq.cn/article/abc"),
+    ("article/abc", "https://www.infoq.cn/topic/article/abc"),
+    ("//static.infoq.cn/p/1", "https://static.infoq.cn/p/1"),
+    ("https://example.com/p/1", "https://example.com/p/1"),
+    ("  /article/abc  ", "https://www.infoq.cn/article/abc"),
+    ("?page=2", "https://www.infoq.cn/topic/AI?page=2"),
+])
+def test_resolve_link(href, expected):
+    assert resolve_link(BASE, href) == expected
+
+
+@pytest.mark.parametrize("href", [
+    None, "", "   ", "#", "#top", "javascript:void(0)", "mailto:editor@infoq.cn", "tel:123",
+    BASE, BASE + "/", BASE + "#comments",
+])
+def test_resolve_link_rejects_non_article_links(href):
+    assert resolve_link(BASE, href) == ""
+
+
+def test_resolve_link_without_base():
+    assert resolve_link("", "https://example.com/p/1") == "https://example.com/p/1"
+    assert resolve_link("", "/p/1") == ""
+
+
+@pytest.mark.parametrize("link", [
+    "https://techcrunch.com/2025/06/10/openai-model/",
+    "http://techcrunch.com/2025/06/10/openai-model",
+    "https://www.TechCrunch.com/2025/06/10/openai-model/#comments",
+    "https://techcrunch.com:443/2025/06/10/openai-model?utm_source=rss&utm_medium=feed",
+    "https://techcrunch.com/2025/06/10/openai-model?fbclid=abc&gclid=def&spm=a.b.c",
+    "https://news.google.com/articles?url=https%3A%2F%2Ftechcrunch.com%2F2025%2F06%2F10%2Fopenai-model%2F",
+    "https://t.co/x?url=https%3A%2F%2Fnews.google.com%2Fa%3Furl%3Dhttps%253A%252F%252Ftechcrunch.com%252F2025%252F06%252F10%252Fopenai-model",
+])
+def test_canonical_url_merges_variants(link):
+    assert canonical_url(link) == "https://techcrunch.com/2025/06/10/openai-model"
+
+
+def test_canonical_url_keeps_ordinary_params():
+    # source/from/ref等普通参数可能决定页面内容，不能当作跟踪参数去掉
+    assert canonical_url("https://example.com/list?from=20&source=rss&ref=main&id=3&utm_campaign=x") == \
+        "https://example.com/list?from=20&id=3&ref=main&source=rss"
+    assert canonical_url("https://example.com/list?from=20") != canonical_url("https://example.com/list?from=40")
+
+
+def test_canonical_url_sorts_query_and_keeps_port():
+    assert canonical_url("https://example.com:8080/p?b=2&a=1") == "https://example.com:8080/p?a=1&b=2"
+    assert canonical_url("https://example.com/") == "https://example.com/"
+
+
+@pytest.mark.parametrize("link", ["", "not a url", "/relative/path", "http://[::1"])
+def test_canonical_url_leaves_unparseable_links(link):
+    assert canonical_url(link) == link
+
+
+@pytest.mark.parametrize("link, expected", [
+    ("https://example.com/p/1", True),
+    ("https://example.com/?p=1", True),
+    ("https://example.com/", False),
+    ("https://example.com", False),
+    ("/p/1", False),
+])
+def test_is_article_link(link, expected):
+    assert is_article_link(canonical_url(link)) is expected
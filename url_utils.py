@@ -0,0 +1,85 @@
+# 链接解析与规范化
+# resolve_link把页面中的相对链接解析为绝对地址，代替各解析函数中手写的字符串拼接；
+# canonical_url把同一篇文章的不同链接形式（跟踪参数、片段、末尾斜杠、大小写主机名、http/https、跳转包装）
+# 归一为同一个键，用于跨源去重，如同一篇TechCrunch文章同时来自"TechCrunch"和"TechCrunch RSS"。
+
+from urllib.parse import parse_qsl, urldefrag, urlencode, urljoin, urlsplit, urlunsplit
+
+# 跟踪参数：只去掉广告/统计平台专用的参数，这些参数不影响文章内容；
+# source、from、ref这类普通名字可能是站点自己的路由参数（如?from=1表示分页），保留
+TRACKING_PARAM_PREFIXES = ("utm_", "mc_", "pk_", "hmsr", "spm")
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "ncid", "sr_share", "guccounter",
+                   "guce_referrer", "guce_referrer_sig", "cmpid", "ref_src", "share_token"}
+# 跳转包装：这些主机把原文地址放在查询参数中
+REDIRECT_HOSTS = {"feedproxy.google.com", "feeds.feedburner.com", "news.google.com", "www.google.com", "google.com",
+                  "t.co", "l.facebook.com", "link.zhihu.com"}
+REDIRECT_PARAMS = ("url", "u", "q", "target", "dest")
+
+
+def resolve_link(base_url, href):
+    """把href相对于base_url解析为绝对地址
+
+    空链接、只有片段的链接("#"、"#top")、javascript:、mailto:等非网页链接，以及解析后指回base_url本身的链接
+    都不是文章地址，返回空字符串。
+    """
+    href = (href or "").strip()
+    if not href or href.startswith("#"):
+        return ""
+    link = urljoin(base_url or "", href)
+    if not link.startswith(("http://", "https://")):
+        return ""
+    if base_url and urldefrag(link)[0].rstrip("/") == urldefrag(base_url)[0].rstrip("/"):
+        return ""
+    return link
+
+
+def is_article_link(link):
+    """规范链接是否指向具体页面：有主机名且不是站点根路径，可以作为去重和已发送记录的键"""
+    parts = urlsplit(link)
+    return bool(parts.netloc) and (parts.path not in ("", "/") or bool(parts.query))
+
+
+def _unwrap_redirect(parts):
+    """跳转包装链接返回查询参数中的原文地址，否则返回None"""
+    if parts.hostname not in REDIRECT_HOSTS:
+        return None
+    for key, value in parse_qsl(parts.query):
+        if key in REDIRECT_PARAMS and value.startswith(("http://", "https://")):
+            return value
+    return None
+
+
+def _is_tracking_param(key):
+    key = key.lower()
+    return key in TRACKING_PARAMS or key.startswith(TRACKING_PARAM_PREFIXES)
+
+
+def canonical_url(link):
+    """返回链接的规范形式（用于去重，不用于显示）
+
+    解开跳转包装，统一为https，主机名小写并去掉www.和默认端口，去掉跟踪参数、片段和末尾斜杠，其余查询参数排序。
+    """
+    link = (link or "").strip()
+    try:
+        parts = urlsplit(link)
+        # 多层包装时逐层解开
+        for _ in range(3):
+            target = _unwrap_redirect(parts)
+            if not target:
+                break
+            parts = urlsplit(target)
+        host = (parts.hostname or "").lower()
+        port = parts.port
+    except ValueError:
+        return link
+    if not host:
+        return link
+
+    if host.startswith("www."):
+        host = host[4:]
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                             if not _is_tracking_param(key)))
+    return urlunsplit(("https", host, path, query, ""))